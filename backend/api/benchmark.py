@@ -0,0 +1,419 @@
+import base64
+import io
+import json
+import statistics
+import time
+from collections import defaultdict, namedtuple
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, reverse
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core.renderers import FastJSONRenderer
+from favorites.models import Favorite
+from recipes.models import Recipe
+from shopping_cart.models import ShoppingCart
+from users.models import Subscription, User
+from .dataset import DATASET_PASSWORD
+
+BATCH_SIZE = 20
+RENDERED_PAGE_SIZE = 100
+
+Call = namedtuple(
+    "Call",
+    ["label", "method", "path", "data", "client", "headers"],
+    defaults=(None, "user", None),
+)
+
+# Эндпоинты djoser для сценариев с письмами, которых нет в Foodgram.
+SKIPPED_URL_NAMES = {
+    "user-activation",
+    "user-resend-activation",
+    "user-reset-password",
+    "user-reset-password-confirm",
+    "user-reset-username",
+    "user-reset-username-confirm",
+    "user-set-username",
+}
+
+
+def percentile(values, fraction):
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def image_data_uri():
+    output = io.BytesIO()
+    Image.new("RGB", (32, 32), "green").save(output, "PNG")
+    encoded = base64.b64encode(output.getvalue()).decode()
+    return f"data:image/png;base64,{encoded}"
+
+
+class BenchmarkContext:
+    """
+    Клиенты и объекты, над которыми выполняются сценарии.
+
+    Основной пользователь — первый в наборе данных, сотрудник — второй.
+    Для парных сценариев (добавить и удалить) выбираются объекты, с
+    которыми основной пользователь ещё не связан.
+    """
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.user = User.objects.get(pk=dataset.user_ids[0])
+        staff = User.objects.get(pk=dataset.user_ids[1])
+        User.objects.filter(pk=staff.pk).update(is_staff=True)
+        self.clients = {
+            "user": self.make_client(self.user),
+            "staff": self.make_client(staff),
+            "anonymous": APIClient(),
+        }
+        self.recipe_id = dataset.recipe_ids[0]
+        self.ingredient_id = dataset.ingredient_ids[0]
+        self.other_user_id = dataset.user_ids[-1]
+        self.free_recipe_id = self.pick_free(
+            dataset.recipe_ids, Favorite, ShoppingCart
+        )
+        related_recipe_ids = set(
+            Favorite.objects.filter(user=self.user).values_list(
+                "recipe_id", flat=True
+            )
+        ) | set(
+            ShoppingCart.objects.filter(user=self.user).values_list(
+                "recipe_id", flat=True
+            )
+        )
+        self.batch_recipe_ids = [
+            recipe_id
+            for recipe_id in dataset.recipe_ids
+            if recipe_id not in related_recipe_ids
+            and recipe_id != self.free_recipe_id
+        ][:BATCH_SIZE]
+        self.free_author_id = next(
+            author_id
+            for author_id in dataset.user_ids[1:]
+            if not Subscription.objects.filter(
+                user=self.user, author_id=author_id
+            ).exists()
+        )
+        self.image = image_data_uri()
+
+    @staticmethod
+    def make_client(user):
+        client = APIClient()
+        token, _ = Token.objects.get_or_create(user=user)
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        return client
+
+    def pick_free(self, recipe_ids, *models):
+        for recipe_id in recipe_ids:
+            if not any(
+                model.objects.filter(user=self.user, recipe_id=recipe_id)
+                .exists()
+                for model in models
+            ):
+                return recipe_id
+        return Recipe.objects.create(
+            author_id=self.other_user_id,
+            name="Свободный рецепт",
+            text="Описание",
+            cooking_time=1,
+            image=Recipe.objects.values_list("image", flat=True).first(),
+        ).pk
+
+    def recipe_payload(self, name):
+        return {
+            "name": name,
+            "text": "Описание рецепта",
+            "cooking_time": 10,
+            "image": self.image,
+            "ingredients": [{"id": self.ingredient_id, "amount": 100}],
+        }
+
+
+def not_modified(label, path, response):
+    return Call(
+        f"{label} not-modified",
+        "get",
+        path,
+        headers={"If-None-Match": response["ETag"]},
+    )
+
+
+def recipe_reads(ctx):
+    list_url = reverse("recipe-list")
+    detail_url = reverse("recipe-detail", args=[ctx.recipe_id])
+    response = yield Call("GET recipe-list", "get", list_url)
+    yield not_modified("GET recipe-list", list_url, response)
+    yield Call(
+        "GET recipe-list anonymous", "get", list_url, client="anonymous"
+    )
+    yield Call(
+        "GET recipe-list cursor", "get", f"{list_url}?pagination=cursor"
+    )
+    yield Call(
+        "GET recipe-list is_favorited", "get", f"{list_url}?is_favorited=1"
+    )
+    yield Call(
+        "GET recipe-list search", "get", f"{list_url}?search=Рецепт"
+    )
+    yield Call("GET recipe-feed", "get", reverse("recipe-feed"))
+    response = yield Call("GET recipe-detail", "get", detail_url)
+    yield not_modified("GET recipe-detail", detail_url, response)
+    yield Call(
+        "GET recipe-get-link",
+        "get",
+        reverse("recipe-get-link", args=[ctx.recipe_id]),
+    )
+    download_url = reverse("recipe-download-shopping-cart")
+    yield Call("GET recipe-download-shopping-cart", "get", download_url)
+    yield Call(
+        "GET recipe-download-shopping-cart pdf",
+        "get",
+        f"{download_url}?format=pdf",
+    )
+
+
+def ingredient_reads(ctx):
+    list_url = reverse("ingredient-list")
+    yield Call("GET ingredient-list", "get", list_url)
+    yield Call("GET ingredient-list search", "get", f"{list_url}?name=сол")
+    yield Call(
+        "GET ingredient-detail",
+        "get",
+        reverse("ingredient-detail", args=[ctx.ingredient_id]),
+    )
+
+
+def user_reads(ctx):
+    yield Call("GET api-root", "get", reverse("api-root"))
+    yield Call("GET user-list", "get", reverse("user-list"))
+    detail_url = reverse("user-detail", args=[ctx.other_user_id])
+    response = yield Call("GET user-detail", "get", detail_url)
+    yield not_modified("GET user-detail", detail_url, response)
+    yield Call("GET user-me", "get", reverse("user-me"))
+    subscriptions_url = reverse("user-subscriptions")
+    yield Call("GET user-subscriptions", "get", subscriptions_url)
+    yield Call(
+        "GET user-subscriptions recipes_limit",
+        "get",
+        f"{subscriptions_url}?recipes_limit=3",
+    )
+    yield Call("GET metrics", "get", reverse("metrics"), client="staff")
+
+
+def recipe_relations(ctx):
+    for name in ("recipe-favorite", "recipe-shopping-cart"):
+        url = reverse(name, args=[ctx.free_recipe_id])
+        yield Call(f"POST {name}", "post", url)
+        yield Call(f"DELETE {name}", "delete", url)
+    for name in ("recipe-favorite-batch", "recipe-shopping-cart-batch"):
+        url = reverse(name)
+        data = {"recipes": ctx.batch_recipe_ids}
+        yield Call(f"POST {name}", "post", url, data)
+        yield Call(f"DELETE {name}", "delete", url, data)
+    url = reverse("user-subscribe", args=[ctx.free_author_id])
+    yield Call("POST user-subscribe", "post", url)
+    yield Call("DELETE user-subscribe", "delete", url)
+
+
+def recipe_writes(ctx):
+    response = yield Call(
+        "POST recipe-list",
+        "post",
+        reverse("recipe-list"),
+        ctx.recipe_payload("Новый рецепт"),
+    )
+    url = reverse("recipe-detail", args=[response.data["id"]])
+    yield Call(
+        "PATCH recipe-detail", "patch", url, ctx.recipe_payload("Изменён")
+    )
+    yield Call("DELETE recipe-detail", "delete", url)
+
+
+def user_writes(ctx):
+    avatar_url = reverse("user-avatar")
+    yield Call("PUT user-avatar", "put", avatar_url, {"avatar": ctx.image})
+    yield Call("DELETE user-avatar", "delete", avatar_url)
+    yield Call(
+        "PATCH user-detail",
+        "patch",
+        reverse("user-detail", args=[ctx.user.pk]),
+        {"first_name": "Имя"},
+    )
+    set_password_url = reverse("user-set-password")
+    for current, new in (
+        (DATASET_PASSWORD, f"{DATASET_PASSWORD}!"),
+        (f"{DATASET_PASSWORD}!", DATASET_PASSWORD),
+    ):
+        yield Call(
+            "POST user-set-password",
+            "post",
+            set_password_url,
+            {"current_password": current, "new_password": new},
+        )
+
+
+def user_lifecycle(ctx):
+    email = f"new{time.monotonic_ns()}@example.com"
+    password = DATASET_PASSWORD
+    response = yield Call(
+        "POST user-list",
+        "post",
+        reverse("user-list"),
+        {
+            "email": email,
+            "username": email.split("@")[0],
+            "first_name": "Новый",
+            "last_name": "Пользователь",
+            "password": password,
+        },
+        client="anonymous",
+    )
+    user_id = response.data["id"]
+    response = yield Call(
+        "POST login",
+        "post",
+        reverse("login"),
+        {"email": email, "password": password},
+        client="anonymous",
+    )
+    ctx.clients["new"] = APIClient()
+    ctx.clients["new"].credentials(
+        HTTP_AUTHORIZATION=f"Token {response.data['auth_token']}"
+    )
+    yield Call("POST logout", "post", reverse("logout"), client="new")
+    ctx.clients["new"].force_authenticate(User.objects.get(pk=user_id))
+    yield Call(
+        "DELETE user-detail",
+        "delete",
+        reverse("user-detail", args=[user_id]),
+        {"current_password": password},
+        client="new",
+    )
+
+
+SCENARIOS = (
+    recipe_reads,
+    ingredient_reads,
+    user_reads,
+    recipe_relations,
+    recipe_writes,
+    user_writes,
+    user_lifecycle,
+)
+
+
+class BenchmarkRunner:
+    """Выполняет сценарии и собирает время и число запросов к БД."""
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+        self.samples = defaultdict(list)
+
+    def run(self, iterations, warmup):
+        for iteration in range(warmup + iterations):
+            for scenario in SCENARIOS:
+                self.run_scenario(scenario, record=iteration >= warmup)
+        return {
+            label: self.summarize(samples)
+            for label, samples in sorted(self.samples.items())
+        }
+
+    def run_scenario(self, scenario, record):
+        steps = scenario(self.ctx)
+        response = None
+        while True:
+            try:
+                call = steps.send(response)
+            except StopIteration:
+                return
+            response, sample = self.perform(call)
+            if record:
+                self.samples[call.label].append(sample)
+
+    def perform(self, call):
+        client = self.ctx.clients[call.client]
+        kwargs = {}
+        if call.data is not None:
+            kwargs = {"data": call.data, "format": "json"}
+        if call.headers is not None:
+            kwargs["headers"] = call.headers
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(client, call.method)(call.path, **kwargs)
+            if response.streaming:
+                b"".join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        return response, (elapsed, len(queries), response.status_code)
+
+    @staticmethod
+    def summarize(samples):
+        timings = sorted(elapsed * 1000 for elapsed, _, _ in samples)
+        queries = [count for _, count, _ in samples]
+        return {
+            "iterations": len(samples),
+            "mean_ms": statistics.fmean(timings),
+            "p50_ms": percentile(timings, 0.5),
+            "p95_ms": percentile(timings, 0.95),
+            "p99_ms": percentile(timings, 0.99),
+            "min_ms": timings[0],
+            "queries_min": min(queries),
+            "queries_max": max(queries),
+            "statuses": sorted({status for _, _, status in samples}),
+        }
+
+
+def time_render(renderer, data, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        content = renderer.render(data)
+    return (time.perf_counter() - started) * 1000 / iterations, content
+
+
+def compare_renderers(ctx, iterations):
+    """
+    Сравнивает JSONRenderer и FastJSONRenderer на больших списках.
+
+    Каждый список запрашивается дважды, чтобы представления рецептов
+    попали в кэш. JSONRenderer получает те же данные без заранее
+    закодированных фрагментов, FastJSONRenderer — данные ответа как есть.
+    """
+    client = ctx.clients["user"]
+    results = {}
+    for name in ("recipe-list", "recipe-feed", "user-subscriptions"):
+        path = f"{reverse(name)}?limit={RENDERED_PAGE_SIZE}"
+        client.get(path)
+        data = client.get(path).data
+        plain = json.loads(JSONRenderer().render(data))
+        default_ms, expected = time_render(JSONRenderer(), plain, iterations)
+        fast_ms, content = time_render(FastJSONRenderer(), data, iterations)
+        results[f"GET {name}"] = {
+            "default_ms": default_ms,
+            "fast_ms": fast_ms,
+            "speedup": default_ms / fast_ms,
+            "identical": content == expected,
+            "bytes": len(content),
+        }
+    return results
+
+
+def get_api_url_names(patterns=None):
+    """Имена всех маршрутов api/urls.py."""
+    if patterns is None:
+        from api.urls import urlpatterns as patterns
+    names = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            names |= get_api_url_names(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+def get_uncovered_url_names(results):
+    covered = {label.split()[1] for label in results}
+    return sorted(get_api_url_names() - covered - SKIPPED_URL_NAMES)
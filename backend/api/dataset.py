@@ -0,0 +1,129 @@
+import io
+import random
+from collections import namedtuple
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from PIL import Image
+
+from favorites.models import Favorite
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from shopping_cart.models import ShoppingCart
+from users.models import Subscription
+
+User = get_user_model()
+
+DATASET_PASSWORD = "Dataset-Password-1"
+PLACEHOLDER_IMAGE = "recipes/placeholder.png"
+INGREDIENTS_PATH = Path(settings.BASE_DIR) / "data" / "ingredients.json"
+MIN_RECIPE_INGREDIENTS = 5
+MAX_RECIPE_INGREDIENTS = 20
+
+DatasetSpec = namedtuple(
+    "DatasetSpec",
+    ["users", "recipes", "subscriptions", "favorites", "carts", "seed"],
+    defaults=(50, 200, 5, 10, 5, 42),
+)
+Dataset = namedtuple("Dataset", ["user_ids", "recipe_ids", "ingredient_ids"])
+
+
+def get_placeholder_image():
+    """Одно общее изображение для всех сгенерированных рецептов."""
+    if not default_storage.exists(PLACEHOLDER_IMAGE):
+        output = io.BytesIO()
+        Image.new("RGB", (64, 64), "orange").save(output, "PNG")
+        default_storage.save(PLACEHOLDER_IMAGE, ContentFile(output.getvalue()))
+    return PLACEHOLDER_IMAGE
+
+
+def load_ingredient_ids():
+    if not Ingredient.objects.exists():
+        call_command(
+            "load_ingredients", path=INGREDIENTS_PATH, stdout=io.StringIO()
+        )
+    return list(Ingredient.objects.order_by("pk").values_list("pk", flat=True))
+
+
+def sample(rng, population, size):
+    return rng.sample(population, min(size, len(population)))
+
+
+def build_dataset(spec):
+    """
+    Заполняет пустую БД детерминированным набором данных.
+
+    Один и тот же spec даёт одинаковые данные: все случайные выборки
+    делаются генератором с зерном spec.seed. Объекты создаются через
+    bulk_create, поэтому счётчики, поисковый индекс и ленты подписок
+    пересчитываются в конце.
+    """
+    rng = random.Random(spec.seed)
+    ingredient_ids = load_ingredient_ids()
+    password = make_password(DATASET_PASSWORD)
+
+    users = User.objects.bulk_create(
+        User(
+            email=f"user{index}@example.com",
+            username=f"user{index}",
+            first_name=f"Имя{index}",
+            last_name=f"Фамилия{index}",
+            password=password,
+        )
+        for index in range(spec.users)
+    )
+    user_ids = [user.pk for user in users]
+
+    Subscription.objects.bulk_create(
+        Subscription(user_id=user_id, author_id=author_id)
+        for user_id in user_ids
+        for author_id in sample(
+            rng,
+            [other for other in user_ids if other != user_id],
+            spec.subscriptions,
+        )
+    )
+
+    image = get_placeholder_image()
+    recipes = Recipe.objects.bulk_create(
+        Recipe(
+            author_id=rng.choice(user_ids),
+            name=f"Рецепт {index}",
+            text=f"Описание рецепта {index}",
+            cooking_time=rng.randint(1, 180),
+            image=image,
+        )
+        for index in range(spec.recipes)
+    )
+    recipe_ids = [recipe.pk for recipe in recipes]
+
+    RecipeIngredient.objects.bulk_create(
+        RecipeIngredient(
+            recipe_id=recipe_id,
+            ingredient_id=ingredient_id,
+            amount=rng.randint(1, 500),
+        )
+        for recipe_id in recipe_ids
+        for ingredient_id in sample(
+            rng,
+            ingredient_ids,
+            rng.randint(MIN_RECIPE_INGREDIENTS, MAX_RECIPE_INGREDIENTS),
+        )
+    )
+
+    relations = ((Favorite, spec.favorites), (ShoppingCart, spec.carts))
+    for model, size in relations:
+        model.objects.bulk_create(
+            model(user_id=user_id, recipe_id=recipe_id)
+            for user_id in user_ids
+            for recipe_id in sample(rng, recipe_ids, size)
+        )
+
+    call_command("recalculate_counters", stdout=io.StringIO())
+    call_command("rebuild_search_index", stdout=io.StringIO())
+    call_command("rebuild_feeds", stdout=io.StringIO())
+    return Dataset(user_ids, recipe_ids, ingredient_ids)
@@ -0,0 +1,144 @@
+import json
+import subprocess
+import tempfile
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from api.benchmark import (
+    SKIPPED_URL_NAMES,
+    BenchmarkContext,
+    BenchmarkRunner,
+    compare_renderers,
+    get_uncovered_url_names,
+)
+from api.dataset import DatasetSpec, build_dataset
+from core.images import rendition_executor
+
+TIME_REGRESSION_THRESHOLD = 0.2
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a deterministic dataset in a temporary test database and "
+        "measure latency and query counts of every API endpoint"
+    )
+
+    def add_arguments(self, parser):
+        defaults = DatasetSpec()
+        for field in DatasetSpec._fields:
+            parser.add_argument(
+                f"--{field}",
+                type=int,
+                default=getattr(defaults, field),
+                help=f"Dataset size: {field} (per user for relations)",
+            )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=20,
+            help="Number of measured runs of every scenario",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=2,
+            help="Number of unmeasured runs before measuring",
+        )
+        parser.add_argument(
+            "--output", help="Write the JSON report to this file"
+        )
+        parser.add_argument(
+            "--compare",
+            help="Baseline JSON report; fail if query counts grew",
+        )
+
+    def handle(self, *args, **options):
+        spec = DatasetSpec(
+            **{field: options[field] for field in DatasetSpec._fields}
+        )
+        results, renderers = self.run_benchmark(spec, options)
+        report = {
+            "meta": {
+                "commit": self.get_commit(),
+                "database": connection.vendor,
+                "django": django.get_version(),
+                "dataset": spec._asdict(),
+                "iterations": options["iterations"],
+            },
+            "results": results,
+            "renderers": renderers,
+            "uncovered": get_uncovered_url_names(results),
+            "skipped": sorted(SKIPPED_URL_NAMES),
+        }
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
+        if options["compare"]:
+            self.compare(report, options["compare"])
+
+    def run_benchmark(self, spec, options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        media_root = tempfile.TemporaryDirectory()
+        try:
+            with override_settings(MEDIA_ROOT=media_root.name):
+                ctx = BenchmarkContext(build_dataset(spec))
+                results = BenchmarkRunner(ctx).run(
+                    options["iterations"], options["warmup"]
+                )
+                renderers = compare_renderers(ctx, options["iterations"])
+                rendition_executor.shutdown(wait=True)
+                return results, renderers
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            media_root.cleanup()
+
+    def get_commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def compare(self, report, path):
+        with open(path, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+        regressions = []
+        for label, result in report["results"].items():
+            before = baseline.get(label)
+            if before is None:
+                continue
+            if result["queries_max"] > before["queries_max"]:
+                regressions.append(
+                    f"{label}: queries {before['queries_max']} -> "
+                    f"{result['queries_max']}"
+                )
+            change = result["p50_ms"] / before["p50_ms"] - 1
+            if change > TIME_REGRESSION_THRESHOLD:
+                self.stderr.write(
+                    f"{label}: p50 {before['p50_ms']:.1f} -> "
+                    f"{result['p50_ms']:.1f} ms ({change:+.0%})"
+                )
+        if regressions:
+            raise CommandError(
+                "Query count regressions:\n" + "\n".join(regressions)
+            )
@@ -0,0 +1,354 @@
+import random
+import time
+from bisect import bisect_left
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max
+
+from api.dataset import (
+    DATASET_PASSWORD,
+    MAX_RECIPE_INGREDIENTS,
+    MIN_RECIPE_INGREDIENTS,
+    get_placeholder_image,
+    load_ingredient_ids,
+    sample,
+)
+from core.images import save_renditions
+from favorites.models import Favorite
+from recipes.models import Recipe, RecipeIngredient
+from shopping_cart.models import ShoppingCart
+from users.models import Subscription
+
+User = get_user_model()
+
+FIXTURE_USERNAME_PREFIX = "fixture_"
+PROGRESS_INTERVAL = 5
+# Повторные выборки восполняют пары, выпавшие как дубликаты.
+MAX_DRAW_ROUNDS = 10
+
+
+def zipf_cum_weights(size, exponent):
+    """Накопленные веса распределения Ципфа: первые элементы популярнее."""
+    return list(accumulate(1 / rank**exponent for rank in range(1, size + 1)))
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a large synthetic dataset with skewed popularity for "
+        "load testing; an interrupted run continues where it stopped"
+    )
+
+    def add_arguments(self, parser):
+        for name, default, help_text in (
+            ("users", 100_000, "Number of users"),
+            ("recipes", 1_000_000, "Number of recipes"),
+            ("subscriptions", 1_000_000, "Total number of subscriptions"),
+            ("favorites", 10_000_000, "Total number of favorites"),
+            ("carts", 1_000_000, "Total number of shopping cart entries"),
+        ):
+            parser.add_argument(
+                f"--{name}", type=int, default=default, help=help_text
+            )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10_000,
+            help="Number of rows written per transaction",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=1.1,
+            help="Zipf exponent of author and recipe popularity",
+        )
+        parser.add_argument(
+            "--no-copy",
+            action="store_true",
+            help="Use bulk_create on PostgreSQL instead of COPY",
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.use_copy = self.supports_copy() and not options["no_copy"]
+        started = time.perf_counter()
+
+        rows = self.generate_users()
+        user_ids = list(
+            self.fixture_users()
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        rows += self.generate_recipes(user_ids)
+        recipe_ids = list(
+            Recipe.objects.filter(
+                author__username__startswith=FIXTURE_USERNAME_PREFIX
+            )
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        authors = self.by_popularity(user_ids, "authors")
+        recipes = self.by_popularity(recipe_ids, "recipes")
+        for name, model, target, targets in (
+            ("subscriptions", Subscription, "author", authors),
+            ("favorites", Favorite, "recipe", recipes),
+            ("carts", ShoppingCart, "recipe", recipes),
+        ):
+            rows += self.generate_relations(
+                name, model, target, options[name], user_ids, targets
+            )
+
+        call_command("recalculate_counters", stdout=self.stdout)
+        call_command(
+            "rebuild_search_index",
+            batch_size=options["batch_size"],
+            stdout=self.stdout,
+        )
+        call_command("rebuild_feeds", stdout=self.stdout)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {rows} rows in {elapsed:.1f} s "
+                f"({rows / elapsed:.0f} rows/s)"
+            )
+        )
+
+    def supports_copy(self):
+        if connection.vendor != "postgresql":
+            return False
+        with connection.cursor() as cursor:
+            return hasattr(cursor.cursor, "copy")
+
+    def fixture_users(self):
+        return User.objects.filter(
+            username__startswith=FIXTURE_USERNAME_PREFIX
+        )
+
+    def by_popularity(self, ids, name):
+        """Перемешивает ids, чтобы популярность не зависела от порядка id."""
+        ordered = list(ids)
+        random.Random(f"{self.options['seed']}:{name}").shuffle(ordered)
+        return ordered
+
+    def run_phase(self, name, start, stop, step, write):
+        """
+        Выполняет write(first, last, rng) для отрезков [start, stop).
+
+        Каждый отрезок пишется в своей транзакции, а генератор случайных
+        чисел зависит только от зерна и начала отрезка, поэтому
+        прерванный запуск можно продолжить с первого незаписанного
+        отрезка и получить те же данные.
+        """
+        if start >= stop:
+            self.stdout.write(f"{name}: already generated")
+            return 0
+        rows = 0
+        started = reported = time.perf_counter()
+        for first in range(start, stop, step):
+            last = min(first + step, stop)
+            rng = random.Random(f"{self.options['seed']}:{name}:{first}")
+            with transaction.atomic():
+                rows += write(first, last, rng)
+            now = time.perf_counter()
+            if now - reported >= PROGRESS_INTERVAL or last == stop:
+                reported = now
+                self.stdout.write(
+                    f"{name}: {last}/{stop}, {rows} rows, "
+                    f"{rows / (now - started):.0f} rows/s"
+                )
+        return rows
+
+    def generate_users(self):
+        password = make_password(DATASET_PASSWORD)
+
+        def write(first, last, rng):
+            return len(
+                self.insert(
+                    User,
+                    [
+                        User(
+                            email=f"{FIXTURE_USERNAME_PREFIX}{index}"
+                            "@example.com",
+                            username=f"{FIXTURE_USERNAME_PREFIX}{index}",
+                            first_name=f"Имя{index}",
+                            last_name=f"Фамилия{index}",
+                            password=password,
+                        )
+                        for index in range(first, last)
+                    ],
+                )
+            )
+
+        return self.run_phase(
+            "users",
+            self.fixture_users().count(),
+            self.options["users"],
+            self.options["batch_size"],
+            write,
+        )
+
+    def generate_recipes(self, user_ids):
+        """
+        Создаёт рецепты с ингредиентами.
+
+        Авторы выбираются по закону Ципфа, у всех рецептов одно общее
+        изображение-заглушка с заранее построенными миниатюрами.
+        """
+        if not user_ids:
+            return 0
+        authors = self.by_popularity(user_ids, "authors")
+        cum_weights = zipf_cum_weights(len(authors), self.options["skew"])
+        ingredient_ids = load_ingredient_ids()
+        image = get_placeholder_image()
+        renditions = save_renditions(image)
+
+        def write(first, last, rng):
+            recipes = self.insert(
+                Recipe,
+                [
+                    Recipe(
+                        author_id=author_id,
+                        name=f"Рецепт {index}",
+                        text=f"Описание рецепта {index}",
+                        cooking_time=rng.randint(1, 180),
+                        image=image,
+                        image_renditions=renditions,
+                    )
+                    for index, author_id in zip(
+                        range(first, last),
+                        rng.choices(
+                            authors, cum_weights=cum_weights, k=last - first
+                        ),
+                    )
+                ],
+                returning=True,
+            )
+            ingredients = self.insert(
+                RecipeIngredient,
+                [
+                    RecipeIngredient(
+                        recipe_id=recipe.pk,
+                        ingredient_id=ingredient_id,
+                        amount=rng.randint(1, 500),
+                    )
+                    for recipe in recipes
+                    for ingredient_id in sample(
+                        rng,
+                        ingredient_ids,
+                        rng.randint(
+                            MIN_RECIPE_INGREDIENTS, MAX_RECIPE_INGREDIENTS
+                        ),
+                    )
+                ],
+            )
+            return len(recipes) + len(ingredients)
+
+        return self.run_phase(
+            "recipes",
+            Recipe.objects.filter(
+                author__username__startswith=FIXTURE_USERNAME_PREFIX
+            ).count(),
+            self.options["recipes"],
+            self.options["batch_size"],
+            write,
+        )
+
+    def generate_relations(
+        self, name, model, target, total, user_ids, targets
+    ):
+        """
+        Создаёт связи пользователей с популярными объектами.
+
+        Пользователи обрабатываются отрезками примерно по batch_size
+        связей; объекты выбираются по закону Ципфа. Продолжение
+        начинается с отрезка после последнего пользователя, у которого
+        уже есть связи.
+        """
+        if not total or not user_ids or not targets:
+            return 0
+        step = max(1, self.options["batch_size"] * len(user_ids) // total)
+        last_user_id = model.objects.filter(
+            user__username__startswith=FIXTURE_USERNAME_PREFIX
+        ).aggregate(last=Max("user_id"))["last"]
+        start = 0
+        if last_user_id is not None:
+            start = (bisect_left(user_ids, last_user_id) // step + 1) * step
+        cum_weights = zipf_cum_weights(len(targets), self.options["skew"])
+
+        def write(first, last, rng):
+            users = user_ids[first:last]
+            size = round(total * len(users) / len(user_ids))
+            pairs = set()
+            for _ in range(MAX_DRAW_ROUNDS):
+                missing = size - len(pairs)
+                if missing <= 0:
+                    break
+                drawn = zip(
+                    rng.choices(users, k=missing),
+                    rng.choices(targets, cum_weights=cum_weights, k=missing),
+                )
+                pairs.update(
+                    pair
+                    for pair in drawn
+                    if target != "author" or pair[0] != pair[1]
+                )
+            return len(
+                self.insert(
+                    model,
+                    [
+                        model(user_id=user_id, **{f"{target}_id": target_id})
+                        for user_id, target_id in sorted(pairs)
+                    ],
+                )
+            )
+
+        return self.run_phase(name, start, len(user_ids), step, write)
+
+    def insert(self, model, objs, returning=False):
+        """Записывает объекты и при returning заполняет их pk."""
+        if not objs:
+            return objs
+        if self.use_copy:
+            self.copy_objects(model, objs, returning)
+        else:
+            model.objects.bulk_create(
+                objs, batch_size=self.options["batch_size"]
+            )
+        return objs
+
+    def copy_objects(self, model, objs, returning):
+        """Записывает объекты через COPY (PostgreSQL, psycopg 3)."""
+        opts = model._meta
+        quote_name = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            if returning:
+                cursor.execute(
+                    "SELECT nextval(pg_get_serial_sequence(%s, %s)) "
+                    "FROM generate_series(1, %s)",
+                    [opts.db_table, opts.pk.column, len(objs)],
+                )
+                for obj, (pk,) in zip(objs, cursor.fetchall()):
+                    obj.pk = pk
+            fields = [
+                field
+                for field in opts.concrete_fields
+                if returning or not field.primary_key
+            ]
+            columns = ", ".join(quote_name(field.column) for field in fields)
+            with cursor.cursor.copy(
+                f"COPY {quote_name(opts.db_table)} ({columns}) FROM STDIN"
+            ) as copy:
+                for obj in objs:
+                    copy.write_row(
+                        [
+                            field.get_db_prep_save(
+                                field.pre_save(obj, True), connection
+                            )
+                            for field in fields
+                        ]
+                    )
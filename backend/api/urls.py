@@ -1,7 +1,16 @@
-from django.urls import include, path
+from django.conf import settings
+from django.urls import include, path, re_path
 from rest_framework.routers import DefaultRouter
 
+from core.views import MetricsView
+from recipes.async_views import (
+    AsyncIngredientSearchView,
+    AsyncRecipeDetailView,
+    AsyncRecipeListView,
+    AsyncShoppingListView,
+)
 from recipes.views import IngredientViewSet, RecipeViewSet
+from users.async_views import AsyncSubscriptionsView
 from users.views import CustomUserViewSet
 
 router = DefaultRouter()
@@ -12,4 +21,40 @@ router.register("recipes", RecipeViewSet)
 urlpatterns = [
     path("", include(router.urls)),
     path("auth/", include("djoser.urls.authtoken")),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
 ]
+
+if settings.ASYNC_READ_VIEWS:
+    sync_views = {url.name: url.callback for url in router.urls}
+    urlpatterns = [
+        path(
+            "users/subscriptions/",
+            AsyncSubscriptionsView.as_view(
+                sync_view=sync_views["user-subscriptions"]
+            ),
+        ),
+        path(
+            "ingredients/",
+            AsyncIngredientSearchView.as_view(
+                sync_view=sync_views["ingredient-list"]
+            ),
+        ),
+        path(
+            "recipes/",
+            AsyncRecipeListView.as_view(sync_view=sync_views["recipe-list"]),
+        ),
+        path(
+            "recipes/download_shopping_cart/",
+            AsyncShoppingListView.as_view(
+                sync_view=sync_views["recipe-download-shopping-cart"]
+            ),
+        ),
+        # Только числовые id: действия вроде recipes/feed/ остаются за
+        # маршрутами роутера.
+        re_path(
+            r"^recipes/(?P<pk>\d+)/$",
+            AsyncRecipeDetailView.as_view(
+                sync_view=sync_views["recipe-detail"]
+            ),
+        ),
+    ] + urlpatterns
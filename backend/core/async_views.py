@@ -0,0 +1,108 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, HttpResponseBase
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .renderers import FastJSONRenderer
+
+
+class AsyncReadView(View):
+    """
+    Асинхронное представление для чтения в режиме ASGI.
+
+    Обслуживает GET-запросы за JSON, все остальные запросы к тому же
+    пути (запись, браузерный API, ?format=) передаёт синхронному
+    представлению sync_view. Аутентификация, проверка прав и ответы об
+    ошибках такие же, как у представлений DRF. get() возвращает данные
+    для рендеринга или готовый HttpResponse.
+    """
+
+    sync_view = None
+    permission_classes = ()
+    renderer_class = FastJSONRenderer
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def is_delegated(self, request):
+        return (
+            request.method != "GET"
+            or api_settings.URL_FORMAT_OVERRIDE in request.GET
+            or "text/html" in request.headers.get("Accept", "")
+        )
+
+    async def dispatch(self, request, *args, **kwargs):
+        if self.is_delegated(request):
+            return await sync_to_async(self.sync_view)(
+                request, *args, **kwargs
+            )
+
+        request = Request(request, authenticators=self.get_authenticators())
+        try:
+            await sync_to_async(self.initial)(request)
+            data = await self.get(request, *args, **kwargs)
+        except Exception as exc:
+            return self.handle_exception(request, exc)
+        if isinstance(data, HttpResponseBase):
+            return data
+        return self.render(data)
+
+    def get_authenticators(self):
+        return [
+            authenticator()
+            for authenticator in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+        ]
+
+    def initial(self, request):
+        """Аутентифицирует пользователя и проверяет права."""
+        request.user
+        self.check_permissions(request)
+
+    def check_permissions(self, request):
+        for permission_class in self.permission_classes:
+            permission = permission_class()
+            if permission.has_permission(request, self):
+                continue
+            if request.authenticators and not request.successful_authenticator:
+                raise exceptions.NotAuthenticated()
+            raise exceptions.PermissionDenied(
+                getattr(permission, "message", None)
+            )
+
+    def handle_exception(self, request, exc):
+        if isinstance(
+            exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+        ):
+            auth_header = request.authenticators[0].authenticate_header(
+                request
+            )
+            if auth_header:
+                exc.auth_header = auth_header
+            else:
+                exc.status_code = 403
+
+        exception_handler = api_settings.EXCEPTION_HANDLER
+        response = exception_handler(exc, {"request": request, "view": self})
+        if response is None:
+            raise exc
+        rendered = self.render(response.data, response.status_code)
+        for name, value in response.items():
+            if name != "Content-Type":
+                rendered[name] = value
+        return rendered
+
+    def render(self, data, status=200):
+        renderer = self.renderer_class()
+        response = HttpResponse(
+            renderer.render(data),
+            status=status,
+            content_type=renderer.media_type,
+        )
+        patch_vary_headers(response, ["Accept"])
+        return response
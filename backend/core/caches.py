@@ -0,0 +1,177 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+
+class BaseCacheBackend:
+    """
+    Базовый бэкенд кэша приложения.
+
+    Считает попадания и промахи в пределах процесса. Как и бэкенды
+    CACHES, получает словарь OPTIONS и берёт из него нужные параметры.
+    """
+
+    def __init__(self, options):
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self._set(key, value)
+
+    def delete(self, key):
+        self._delete(key)
+
+    def clear(self):
+        self._clear()
+
+    def stats(self):
+        with self._stats_lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _set(self, key, value):
+        raise NotImplementedError
+
+    def _delete(self, key):
+        raise NotImplementedError
+
+    def _clear(self):
+        raise NotImplementedError
+
+
+class LocMemLRUBackend(BaseCacheBackend):
+    """
+    LRU-кэш в памяти процесса с ограничением числа записей.
+
+    Если задан timeout, записи устаревают через timeout секунд.
+    """
+
+    def __init__(self, options):
+        super().__init__(options)
+        self.max_entries = options.get("max_entries", 5000)
+        self.timeout = options.get("timeout")
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key, value):
+        expires = None
+        if self.timeout is not None:
+            expires = time.monotonic() + self.timeout
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DjangoCacheBackend(BaseCacheBackend):
+    """Кэш на базе кэш-фреймворка Django."""
+
+    def __init__(self, options):
+        super().__init__(options)
+        self.cache = caches[options.get("alias", "default")]
+        self.timeout = options.get("timeout")
+
+    def _get(self, key):
+        return self.cache.get(key)
+
+    def _set(self, key, value):
+        self.cache.set(key, value, self.timeout)
+
+    def _delete(self, key):
+        self.cache.delete(key)
+
+    def _clear(self):
+        self.cache.clear()
+
+
+class SharedVersion:
+    """
+    Версия данных в кэше Django, общая для всех процессов.
+
+    bump() записывает новую версию, get() и aget() возвращают текущую.
+    Процесс перечитывает её из кэша не чаще раза в
+    SHARED_VERSION_CHECK_INTERVAL секунд. Другие процессы видят новую
+    версию, только если кэш alias общий (файловый, Redis, Memcached).
+    """
+
+    def __init__(self, key, alias="default"):
+        self.key = key
+        self.alias = alias
+        self._state = (None, None)
+
+    def is_checked(self, checked_at):
+        return checked_at is not None and (
+            time.monotonic() - checked_at
+            < settings.SHARED_VERSION_CHECK_INTERVAL
+        )
+
+    def get(self):
+        version, checked_at = self._state
+        if not self.is_checked(checked_at):
+            checked_at = time.monotonic()
+            version = caches[self.alias].get(self.key)
+            self._state = (version, checked_at)
+        return version
+
+    async def aget(self):
+        version, checked_at = self._state
+        if not self.is_checked(checked_at):
+            checked_at = time.monotonic()
+            version = await caches[self.alias].aget(self.key)
+            self._state = (version, checked_at)
+        return version
+
+    def bump(self):
+        version = uuid.uuid4().hex
+        caches[self.alias].set(self.key, version, None)
+        self._state = (version, time.monotonic())
+        return version
+
+
+def load_cache_backend(config):
+    """Создаёт бэкенд по настройке вида {"BACKEND": ..., "OPTIONS": ...}."""
+    backend = import_string(config["BACKEND"])
+    return backend(config.get("OPTIONS", {}))
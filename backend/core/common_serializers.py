@@ -1,12 +1,41 @@
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
+from core.fields import ImageRenditionsField
+from core.toggles import insert_ignore
 from recipes.models import Recipe
 
 
+def non_field_error(message, code=None):
+    return serializers.ValidationError(
+        {api_settings.NON_FIELD_ERRORS_KEY: [message]}, code=code
+    )
+
+
+class InsertIgnoreSerializerMixin:
+    """
+    Создаёт связь одним INSERT ... ON CONFLICT DO NOTHING.
+
+    Поля связи передаются в save(), а существующая связь вместо
+    отдельного SELECT UniqueTogetherValidator определяется по числу
+    вставленных строк и даёт ошибку unique_message.
+    """
+
+    unique_message = None
+
+    def create(self, validated_data):
+        instance = self.Meta.model(**validated_data)
+        if not insert_ignore(instance):
+            raise non_field_error(self.unique_message, code="unique")
+        return instance
+
+
 class RecipeMinifiedSerializer(serializers.ModelSerializer):
     """Сериализатор для краткого представления рецепта."""
 
+    image_renditions = ImageRenditionsField("image")
+
     class Meta:
         model = Recipe
-        fields = ("id", "name", "image", "cooking_time")
+        fields = ("id", "name", "image", "image_renditions", "cooking_time")
         read_only_fields = ("id", "name", "image", "cooking_time")
@@ -0,0 +1,43 @@
+import hashlib
+import json
+
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+# Ответы зависят от пользователя: флаги избранного, списка покупок и
+# подписки входят в ETag.
+VARY_HEADERS = ["Authorization"]
+
+
+def make_etag(*parts):
+    """Сильный ETag по значениям, от которых зависит ответ."""
+    payload = json.dumps(
+        parts, default=str, separators=(",", ":"), sort_keys=True
+    )
+    digest = hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request, etag):
+    """
+    Совпадает ли etag с If-None-Match запроса.
+
+    Сравнение слабое, как требует RFC 9110 для If-None-Match: nginx при
+    сжатии ответа превращает ETag в W/"...".
+    """
+    if_none_match = request.headers.get("If-None-Match", "")
+    if if_none_match.strip() == "*":
+        return True
+    tags = parse_etags(if_none_match)
+    return etag in (tag.removeprefix("W/") for tag in tags)
+
+
+def set_etag(response, etag):
+    response["ETag"] = etag
+    patch_vary_headers(response, VARY_HEADERS)
+    return response
+
+
+def not_modified(etag):
+    return set_etag(HttpResponseNotModified(), etag)
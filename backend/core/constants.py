@@ -1,5 +1,7 @@
 MAX_PAGINATION_SIZE = 100
 COMMON_PAGINATION_SIZE = 6
+PAGE_PAGINATION_MODE = "page"
+CURSOR_PAGINATION_MODE = "cursor"
 
 MAX_EMAIL_LENGTH = 254
 MAX_FIRST_NAME_LENGTH = 150
@@ -8,6 +10,16 @@ MAX_RECIPE_NAME_LENGTH = 256
 MAX_INGREDIENT_NAME_LENGTH = 128
 MAX_MEASUREMENT_UNIT_NAME_LENGTH = 64
 MAX_SHORT_LINK_LENGTH = 10
+SHORT_LINK_LENGTH = 6
 
 MIN_AMOUNT_OF_INGREDIENT = 1
 MIN_COOKING_TIME = 1
+MAX_FILTER_INGREDIENTS = 20
+MAX_BATCH_RECIPES = 1000
+
+INGREDIENTS_BATCH_SIZE = 1000
+
+FEED_BACKFILL_SIZE = 100
+FEED_BATCH_SIZE = 1000
+
+MAX_IMAGE_SIZE = 5 * 1024 * 1024
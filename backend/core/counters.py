@@ -0,0 +1,24 @@
+from django.db.models import F
+
+
+def change_counter(model, pk, field, delta):
+    """
+    Атомарно меняет денормализованный счётчик на delta.
+
+    Изменение выполняется одним UPDATE с F(), поэтому не теряется при
+    конкурентных запросах; счётчик не опускается ниже нуля.
+    """
+    queryset = model.objects.filter(pk=pk)
+    if delta < 0:
+        queryset = queryset.filter(**{f"{field}__gte": -delta})
+    return queryset.update(**{field: F(field) + delta})
+
+
+def change_counters(model, pks, field, delta):
+    """Меняет счётчик на delta у нескольких объектов одним UPDATE."""
+    if not pks:
+        return 0
+    queryset = model.objects.filter(pk__in=pks)
+    if delta < 0:
+        queryset = queryset.filter(**{f"{field}__gte": -delta})
+    return queryset.update(**{field: F(field) + delta})
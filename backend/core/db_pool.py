@@ -0,0 +1,56 @@
+import threading
+
+from django.db import connections
+
+_lock = threading.Lock()
+_counters = {"opened": 0, "requests": 0}
+
+
+def increment(name):
+    with _lock:
+        _counters[name] += 1
+
+
+def get_pool_stats(alias="default"):
+    """
+    Статистика соединений процесса с БД.
+
+    Для пула psycopg 3 — занятые и свободные соединения, очередь и
+    суммарное время ожидания. Без пула — число открытых процессом
+    соединений на число обработанных запросов.
+    """
+    connection = connections[alias]
+    pool = getattr(connection, "pool", None)
+    if pool is not None:
+        stats = pool.get_stats()
+        size = stats.get("pool_size", 0)
+        idle = stats.get("pool_available", 0)
+        return {
+            "mode": "pool",
+            "min_size": stats.get("pool_min", 0),
+            "max_size": stats.get("pool_max", 0),
+            "in_use": size - idle,
+            "idle": idle,
+            "waiting": stats.get("requests_waiting", 0),
+            "requests": stats.get("requests_num", 0),
+            "queued": stats.get("requests_queued", 0),
+            "wait_ms": stats.get("requests_wait_ms", 0),
+            "timeouts": stats.get("requests_errors", 0),
+            "connections_lost": stats.get("connections_lost", 0),
+        }
+
+    with _lock:
+        counters = dict(_counters)
+    requests = counters["requests"]
+    conn_max_age = connection.settings_dict["CONN_MAX_AGE"]
+    return {
+        "mode": "persistent" if conn_max_age else "none",
+        "conn_max_age": conn_max_age,
+        "opened": counters["opened"],
+        "requests": requests,
+        "reuse_ratio": (
+            max(requests - counters["opened"], 0) / requests
+            if requests
+            else 0.0
+        ),
+    }
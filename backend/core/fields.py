@@ -1,19 +1,74 @@
 import base64
+import binascii
 import uuid
 
 from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 
+from core.constants import MAX_IMAGE_SIZE
+from core.images import get_renditions_field, has_renditions
+
 
 class Base64ImageField(serializers.ImageField):
-    """Поле для работы с изображениями в формате base64."""
+    """
+    Поле для работы с изображениями в формате base64.
+
+    Размер проверяется по длине закодированной строки до декодирования.
+    """
+
+    default_error_messages = {
+        "too_large": "Размер изображения не должен превышать {max_size} МБ.",
+        "invalid_base64": "Некорректное изображение в формате base64.",
+    }
+
+    def __init__(self, *args, max_size=MAX_IMAGE_SIZE, **kwargs):
+        self.max_size = max_size
+        super().__init__(*args, **kwargs)
 
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith("data:image"):
-            format, imgstr = data.split(";base64,")
+            format, _, imgstr = data.partition(";base64,")
+            if len(imgstr) > -(-self.max_size // 3) * 4:
+                self.fail("too_large", max_size=self.max_size // 1024**2)
             ext = format.split("/")[-1]
             filename = str(uuid.uuid4())
-            data = ContentFile(
-                base64.b64decode(imgstr), name=f"{filename}.{ext}"
-            )
+            try:
+                content = base64.b64decode(imgstr)
+            except (binascii.Error, ValueError):
+                self.fail("invalid_base64")
+            data = ContentFile(content, name=f"{filename}.{ext}")
         return super().to_internal_value(data)
+
+
+class ImageRenditionsField(serializers.Field):
+    """
+    Ссылки на миниатюры изображения.
+
+    Возвращает None, пока миниатюры текущего файла не построены.
+    """
+
+    def __init__(self, image_field, **kwargs):
+        self.image_field = image_field
+        kwargs["source"] = "*"
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        if not has_renditions(instance, self.image_field):
+            return None
+        renditions = getattr(instance, get_renditions_field(self.image_field))
+        request = self.context.get("request")
+        return {
+            name: {
+                extension: self.build_url(request, path)
+                for extension, path in formats.items()
+            }
+            for name, formats in renditions.items()
+            if name != "source"
+        }
+
+    @staticmethod
+    def build_url(request, path):
+        url = default_storage.url(path)
+        return request.build_absolute_uri(url) if request else url
@@ -0,0 +1,178 @@
+import io
+import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+Rendition = namedtuple("Rendition", ["name", "size", "crop"])
+
+RENDITIONS = (
+    Rendition("thumbnail", (160, 160), True),
+    Rendition("card", (640, 480), False),
+)
+RENDITION_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+RENDITION_QUALITY = 80
+RENDITIONS_DIR = "renditions"
+
+rendition_executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_RENDITION_WORKERS,
+    thread_name_prefix="image-renditions",
+)
+rendition_slots = threading.BoundedSemaphore(
+    settings.IMAGE_RENDITION_QUEUE_SIZE
+)
+
+
+def get_renditions_field(field_name):
+    """Имя JSON-поля, в котором хранятся производные изображения."""
+    return f"{field_name}_renditions"
+
+
+def get_rendition_path(source, rendition, extension):
+    path = PurePosixPath(source)
+    return str(
+        PurePosixPath(RENDITIONS_DIR)
+        / path.parent
+        / f"{path.stem}_{rendition.name}.{extension}"
+    )
+
+
+def iter_rendition_paths(renditions):
+    for name, formats in renditions.items():
+        if name != "source":
+            yield from formats.values()
+
+
+def has_renditions(instance, field_name):
+    """Готовы ли производные изображения для текущего файла поля."""
+    image = getattr(instance, field_name)
+    renditions = getattr(instance, get_renditions_field(field_name))
+    return bool(image) and renditions.get("source") == image.name
+
+
+def render_image(image, rendition, image_format):
+    if rendition.crop:
+        image = ImageOps.fit(image, rendition.size, Image.Resampling.LANCZOS)
+    else:
+        image = image.copy()
+        image.thumbnail(rendition.size, Image.Resampling.LANCZOS)
+    if image_format == "JPEG" and image.mode == "RGBA":
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    output = io.BytesIO()
+    image.save(output, image_format, quality=RENDITION_QUALITY)
+    return output.getvalue()
+
+
+def open_image(source):
+    with default_storage.open(source, "rb") as file:
+        image = Image.open(file)
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+    return image
+
+
+def save_renditions(source):
+    """Сохраняет производные изображения файла source и возвращает пути."""
+    image = open_image(source)
+    renditions = {"source": source}
+    for rendition in RENDITIONS:
+        renditions[rendition.name] = {}
+        for extension, image_format in RENDITION_FORMATS.items():
+            path = get_rendition_path(source, rendition, extension)
+            if default_storage.exists(path):
+                default_storage.delete(path)
+            renditions[rendition.name][extension] = default_storage.save(
+                path,
+                ContentFile(render_image(image, rendition, image_format)),
+            )
+    return renditions
+
+
+def build_renditions(model, pk, field_name, source, extra_updates=None):
+    """
+    Строит миниатюры файла source и сохраняет пути к ним в объекте.
+
+    Пути записываются, только если за это время изображение объекта не
+    сменилось; файлы прошлых миниатюр удаляются. extra_updates
+    обновляются вместе с путями.
+    """
+    renditions_field = get_renditions_field(field_name)
+    try:
+        try:
+            renditions = save_renditions(source)
+        except FileNotFoundError:
+            # Изображение успели заменить или удалить до запуска задачи.
+            return
+
+        queryset = model.objects.filter(pk=pk)
+        previous = (
+            queryset.values_list(renditions_field, flat=True).first() or {}
+        )
+        updated = queryset.filter(**{field_name: source}).update(
+            **{renditions_field: renditions}, **(extra_updates or {})
+        )
+        new_paths = set(iter_rendition_paths(renditions))
+        if updated:
+            obsolete = set(iter_rendition_paths(previous)) - new_paths
+        else:
+            obsolete = new_paths
+        for path in obsolete:
+            default_storage.delete(path)
+    except Exception:
+        logger.exception(
+            "Failed to build renditions of %s for %s %s",
+            source,
+            model._meta.label,
+            pk,
+        )
+
+
+def build_renditions_in_worker(*args):
+    """Строит миниатюры в пуле и закрывает соединения с БД потока."""
+    try:
+        build_renditions(*args)
+    finally:
+        connections.close_all()
+        rendition_slots.release()
+
+
+def schedule_renditions(instance, field_name, extra_updates=None):
+    """
+    Ставит построение миниатюр изображения в очередь.
+
+    Очередь ограничена IMAGE_RENDITION_QUEUE_SIZE: при переполнении
+    задача отбрасывается, а клиенты получают исходное изображение,
+    пока миниатюры не построит команда build_image_renditions.
+    """
+    image = getattr(instance, field_name)
+    if not image or has_renditions(instance, field_name):
+        return False
+    if not rendition_slots.acquire(blocking=False):
+        logger.warning(
+            "Rendition queue is full, skipping %s %s",
+            instance._meta.label,
+            instance.pk,
+        )
+        return False
+    rendition_executor.submit(
+        build_renditions_in_worker,
+        type(instance),
+        instance.pk,
+        field_name,
+        image.name,
+        extra_updates,
+    )
+    return True
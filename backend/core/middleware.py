@@ -0,0 +1,107 @@
+import json
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .performance import (
+    RequestStats,
+    current_stats,
+    get_action_name,
+    histogram,
+    install_query_recorder,
+    install_serializer_timer,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def install_on_new_connection(sender, connection, **kwargs):
+    install_query_recorder(connection)
+
+
+class PerformanceMiddleware:
+    """
+    Замеры производительности запросов.
+
+    Для каждого запроса считает число и время SQL-запросов, время
+    сериализации и общее время. Добавляет заголовок Server-Timing, пишет
+    строку лога в JSON и пополняет гистограмму по действиям. SQL
+    запросов, превысивших PERFORMANCE_QUERY_BUDGET или
+    PERFORMANCE_TIME_BUDGET_MS, пишется в лог с уровнем WARNING.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        connection_created.connect(
+            install_on_new_connection, dispatch_uid="performance_middleware"
+        )
+        install_serializer_timer()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        stats, token = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        return self.finish(request, response, stats)
+
+    async def __acall__(self, request):
+        stats, token = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        return self.finish(request, response, stats)
+
+    def start(self):
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+        stats = RequestStats()
+        return stats, current_stats.set(stats)
+
+    def finish(self, request, response, stats):
+        action = get_action_name(request)
+        wall_time = stats.wall_time
+        histogram.observe(action, stats)
+
+        response["Server-Timing"] = ", ".join(
+            [
+                f'sql;desc="{stats.query_count} queries";'
+                f"dur={stats.sql_time * 1000:.1f}",
+                f"serializer;dur={stats.serializer_time * 1000:.1f}",
+                f"total;dur={wall_time * 1000:.1f}",
+            ]
+        )
+        record = {
+            "action": action,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": stats.query_count,
+            "sql_ms": round(stats.sql_time * 1000, 2),
+            "serializer_ms": round(stats.serializer_time * 1000, 2),
+            "wall_ms": round(wall_time * 1000, 2),
+        }
+        logger.info(json.dumps(record, ensure_ascii=False))
+
+        if (
+            stats.query_count > settings.PERFORMANCE_QUERY_BUDGET
+            or wall_time * 1000 > settings.PERFORMANCE_TIME_BUDGET_MS
+        ):
+            record["sql"] = [
+                {"sql": sql, "ms": round(duration * 1000, 2)}
+                for sql, duration in stats.queries
+            ]
+            logger.warning(json.dumps(record, ensure_ascii=False))
+        return response
@@ -1,8 +1,22 @@
-from rest_framework.pagination import PageNumberPagination
+import binascii
+import contextlib
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 from core.constants import (
-    MAX_PAGINATION_SIZE,
     COMMON_PAGINATION_SIZE,
+    CURSOR_PAGINATION_MODE,
+    MAX_PAGINATION_SIZE,
+    PAGE_PAGINATION_MODE,
 )
 
 
@@ -12,3 +26,255 @@ class CustomPagination(PageNumberPagination):
     page_size_query_param = "limit"
     max_page_size = MAX_PAGINATION_SIZE
     page_size = COMMON_PAGINATION_SIZE
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Асинхронный вариант paginate_queryset."""
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg)
+        self.page.object_list = [obj async for obj in self.page.object_list]
+        return list(self.page)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная пагинация по ключу сортировки.
+
+    Страница выбирается условием на значения полей сортировки последнего
+    показанного объекта, поэтому не нужны ни COUNT(*), ни OFFSET.
+    Сортировка берётся из queryset (или Meta.ordering модели) и
+    дополняется первичным ключом, чтобы ключ был уникальным. Сортировать
+    можно и по аннотациям, например по релевантности поиска.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "limit"
+    max_page_size = MAX_PAGINATION_SIZE
+    page_size = COMMON_PAGINATION_SIZE
+    invalid_cursor_message = "Некорректный курсор."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, position, reverse = self.get_page_queryset(
+            queryset, request
+        )
+        return self.finish_page(list(queryset), position, reverse)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Асинхронный вариант paginate_queryset."""
+        queryset, position, reverse = self.get_page_queryset(
+            queryset, request
+        )
+        results = [obj async for obj in queryset]
+        return self.finish_page(results, position, reverse)
+
+    def get_page_queryset(self, queryset, request):
+        """Возвращает запрос страницы с одним лишним объектом."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+        self.annotations = queryset.query.annotations
+        self.ordering = self.get_ordering(queryset)
+        position, reverse = self.decode_cursor(request)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(self.invert(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.build_filter(ordering, position))
+        return queryset[: self.page_size + 1], position, reverse
+
+    def finish_page(self, results, position, reverse):
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+
+        self.first, self.last = (
+            (results[0], results[-1]) if results else (None, None)
+        )
+        if reverse:
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        return results
+
+    def get_page_size(self, request):
+        with contextlib.suppress(KeyError, ValueError):
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        return self.page_size
+
+    def get_ordering(self, queryset):
+        ordering = tuple(
+            queryset.query.order_by or queryset.model._meta.ordering
+        )
+        pk_name = queryset.model._meta.pk.name
+        if not {pk_name, f"-{pk_name}", "pk", "-pk"} & set(ordering):
+            descending = bool(ordering) and ordering[-1].startswith("-")
+            ordering += (f"-{pk_name}" if descending else pk_name,)
+        return ordering
+
+    @staticmethod
+    def invert(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    def get_field(self, field):
+        name = field.lstrip("-")
+        if name in self.annotations:
+            return self.annotations[name].output_field
+        if name == "pk":
+            return self.model._meta.pk
+        return self.model._meta.get_field(name)
+
+    def get_attname(self, field):
+        name = field.lstrip("-")
+        if name in self.annotations:
+            return name
+        return self.get_field(field).attname
+
+    def value_to_string(self, field, obj):
+        if field.lstrip("-") in self.annotations:
+            return str(getattr(obj, self.get_attname(field)))
+        return self.get_field(field).value_to_string(obj)
+
+    def build_filter(self, ordering, position):
+        """Строит условие «строго после position» для составного ключа."""
+        conditions = Q()
+        for index, field in enumerate(ordering):
+            lookup = "lt" if field.startswith("-") else "gt"
+            attname = self.get_attname(field)
+            condition = Q(**{f"{attname}__{lookup}": position[index]})
+            for prev_index, prev in enumerate(ordering[:index]):
+                condition &= Q(
+                    **{self.get_attname(prev): position[prev_index]}
+                )
+            conditions |= condition
+        return conditions
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode()))
+            values = payload["p"]
+            if len(values) != len(self.ordering):
+                raise ValueError
+            position = [
+                self.get_field(field).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+            return position, bool(payload.get("r"))
+        except (
+            binascii.Error,
+            KeyError,
+            TypeError,
+            ValueError,
+            ValidationError,
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, obj, reverse):
+        values = [self.value_to_string(field, obj) for field in self.ordering]
+        payload = json.dumps({"p": values, "r": int(reverse)})
+        encoded = urlsafe_b64encode(payload.encode()).decode()
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or self.last is None:
+            return None
+        return self.encode_cursor(self.last, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first is None:
+            url = self.request.build_absolute_uri()
+            return remove_query_param(url, self.cursor_query_param)
+        return self.encode_cursor(self.first, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "results": schema,
+            },
+        }
+
+
+class FeedPagination(BasePagination):
+    """
+    Пагинация лент.
+
+    По умолчанию работает как CustomPagination. Курсорный режим
+    включается параметром ?pagination=cursor, наличием курсора в запросе
+    или настройкой PAGINATION_MODE.
+    """
+
+    mode_query_param = "pagination"
+
+    def get_mode(self, request):
+        if request.query_params.get(KeysetPagination.cursor_query_param):
+            return CURSOR_PAGINATION_MODE
+        mode = request.query_params.get(
+            self.mode_query_param, settings.PAGINATION_MODE
+        )
+        if mode not in (PAGE_PAGINATION_MODE, CURSOR_PAGINATION_MODE):
+            return PAGE_PAGINATION_MODE
+        return mode
+
+    def get_paginator(self, request):
+        if self.get_mode(request) == CURSOR_PAGINATION_MODE:
+            return KeysetPagination()
+        return CustomPagination()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.get_paginator(request)
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Асинхронный вариант paginate_queryset."""
+        self.paginator = self.get_paginator(request)
+        return await self.paginator.apaginate_queryset(
+            queryset, request, view
+        )
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return CustomPagination().get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        return CustomPagination().get_schema_operation_parameters(view)
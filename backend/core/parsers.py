@@ -0,0 +1,37 @@
+import codecs
+import io
+import re
+
+import orjson
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from .renderers import FastJSONRenderer
+
+# orjson читает целые длиннее 64 бит как float, json — как int.
+LONG_NUMBER = re.compile(rb"\d{19,}")
+
+
+class FastJSONParser(JSONParser):
+    """
+    Парсер JSON на orjson.
+
+    Тела в других кодировках, тела с числами длиннее 64 бит и всё, что
+    orjson не принимает (одиночные суррогаты, ошибки синтаксиса),
+    разбирает стандартный JSONParser: результат и тексты ошибок те же.
+    """
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if not self.strict or codecs.lookup(encoding).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+        content = stream.read()
+        if not LONG_NUMBER.search(content):
+            try:
+                return orjson.loads(content)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(content), media_type, parser_context)
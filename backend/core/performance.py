@@ -0,0 +1,154 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from rest_framework.serializers import BaseSerializer
+
+MAX_RECORDED_QUERIES = 1000
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+current_stats = ContextVar("current_request_stats", default=None)
+
+
+class RequestStats:
+    """Показатели одного запроса: SQL, сериализация и общее время."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.queries = []
+        self.serializing = False
+
+    def add_query(self, sql, duration):
+        self.query_count += 1
+        self.sql_time += duration
+        if len(self.queries) < MAX_RECORDED_QUERIES:
+            self.queries.append((sql, duration))
+
+    @property
+    def wall_time(self):
+        return time.perf_counter() - self.started
+
+
+def record_query(execute, sql, params, many, context):
+    """Обёртка выполнения запросов, учитывающая их в текущем запросе."""
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add_query(sql, time.perf_counter() - started)
+
+
+def install_query_recorder(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+_serializer_data = BaseSerializer.data
+
+
+def timed_serializer_data(self):
+    """
+    Замеряет получение serializer.data верхнего уровня.
+
+    Вложенные сериализаторы учитываются во времени внешнего. Запросы,
+    выполненные при сериализации, входят и во время SQL.
+    """
+    stats = current_stats.get()
+    if stats is None or stats.serializing:
+        return _serializer_data.fget(self)
+    stats.serializing = True
+    started = time.perf_counter()
+    try:
+        return _serializer_data.fget(self)
+    finally:
+        stats.serializing = False
+        stats.serializer_time += time.perf_counter() - started
+
+
+def install_serializer_timer():
+    BaseSerializer.data = property(timed_serializer_data)
+
+
+class LatencyHistogram:
+    """Гистограмма времени ответа по действиям представлений."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._actions = {}
+
+    def observe(self, action, stats):
+        wall_ms = stats.wall_time * 1000
+        with self._lock:
+            entry = self._actions.setdefault(
+                action,
+                {
+                    "count": 0,
+                    "wall_ms": 0.0,
+                    "sql_ms": 0.0,
+                    "serializer_ms": 0.0,
+                    "queries": 0,
+                    "max_queries": 0,
+                    "buckets": [0] * (len(self.buckets) + 1),
+                },
+            )
+            entry["count"] += 1
+            entry["wall_ms"] += wall_ms
+            entry["sql_ms"] += stats.sql_time * 1000
+            entry["serializer_ms"] += stats.serializer_time * 1000
+            entry["queries"] += stats.query_count
+            entry["max_queries"] = max(
+                entry["max_queries"], stats.query_count
+            )
+            entry["buckets"][bisect_left(self.buckets, wall_ms)] += 1
+
+    def snapshot(self):
+        """Возвращает гистограмму с границами корзин и средними."""
+        labels = [f"le_{bound}" for bound in self.buckets] + ["inf"]
+        with self._lock:
+            actions = {
+                action: dict(entry, buckets=list(entry["buckets"]))
+                for action, entry in self._actions.items()
+            }
+        return {
+            action: {
+                "count": entry["count"],
+                "mean_ms": entry["wall_ms"] / entry["count"],
+                "mean_sql_ms": entry["sql_ms"] / entry["count"],
+                "mean_serializer_ms": entry["serializer_ms"] / entry["count"],
+                "mean_queries": entry["queries"] / entry["count"],
+                "max_queries": entry["max_queries"],
+                "buckets": dict(zip(labels, entry["buckets"])),
+            }
+            for action, entry in sorted(actions.items())
+        }
+
+
+histogram = LatencyHistogram()
+
+
+def get_action_name(request):
+    """
+    Имя действия вида RecipeViewSet.list.
+
+    Для вьюсетов DRF берётся действие, соответствующее методу запроса.
+    """
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+    view = match.func
+    view_class = getattr(view, "cls", None) or getattr(
+        view, "view_class", None
+    )
+    if view_class is None:
+        return f"{view.__module__}.{view.__name__}"
+    method = request.method.lower()
+    actions = getattr(view, "actions", None) or {}
+    return f"{view_class.__name__}.{actions.get(method, method)}"
@@ -0,0 +1,124 @@
+import json
+import math
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+)
+# Вне этого диапазона json пишет числа с показателем степени (1e-05,
+# 1e+16), а orjson — иначе (0.00001, 1e16).
+MIN_PLAIN_FLOAT = 1e-4
+MAX_PLAIN_FLOAT = 1e16
+# JSONRenderer экранирует разделители строк U+2028 и U+2029.
+LINE_SEPARATOR_PREFIX = b"\xe2\x80"
+LINE_SEPARATORS = (
+    (b"\xe2\x80\xa8", b"\\u2028"),
+    (b"\xe2\x80\xa9", b"\\u2029"),
+)
+# Типы, которые orjson и json всегда записывают одинаково.
+SCALAR_TYPES = frozenset((str, int, bool, type(None)))
+
+
+def is_plain_float(value):
+    """Записывают ли json и orjson число одинаково."""
+    if value == 0:
+        return True
+    return math.isfinite(value) and (
+        MIN_PLAIN_FLOAT <= abs(value) < MAX_PLAIN_FLOAT
+    )
+
+
+def has_special_floats(data):
+    """
+    Есть ли в data числа, которые orjson записывает не так, как json.
+
+    Это NaN, бесконечности и числа вне диапазона без показателя
+    степени. Фрагменты не проверяются: они уже закодированы.
+    """
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if type(value) in SCALAR_TYPES:
+            continue
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif isinstance(value, float) and not is_plain_float(value):
+            return True
+    return False
+
+
+class JSONFragment:
+    """
+    Заранее закодированный фрагмент JSON.
+
+    FastJSONRenderer вставляет байты фрагмента в ответ без повторного
+    кодирования. Другие рендереры DRF кодируют его как обычное значение:
+    стандартный JSONEncoder вызывает tolist().
+    """
+
+    __slots__ = ("content",)
+
+    def __init__(self, content):
+        self.content = content
+
+    @classmethod
+    def encode(cls, data):
+        return cls(FastJSONRenderer().render(data))
+
+    def tolist(self):
+        return json.loads(self.content)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Рендерер JSON на orjson с тем же выводом, что у JSONRenderer.
+
+    Типы, которые orjson кодирует иначе (даты, dataclass, объекты с
+    tolist() и т. п.), передаются кодировщику DRF. Ответы с отступами,
+    словари с нестроковыми ключами, NaN, бесконечности и числа, которые
+    json пишет с показателем степени, рендерит стандартный JSONRenderer.
+    """
+
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.needs_stock_renderer(
+            data, accepted_media_type, renderer_context or {}
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            content = orjson.dumps(
+                data, default=self.default, option=ORJSON_OPTIONS
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if LINE_SEPARATOR_PREFIX in content:
+            for separator, escaped in LINE_SEPARATORS:
+                content = content.replace(separator, escaped)
+        return content
+
+    def needs_stock_renderer(self, data, accepted_media_type, context):
+        """Нужен ли ответу вывод, который orjson не воспроизводит."""
+        return (
+            self.get_indent(accepted_media_type, context) is not None
+            or self.ensure_ascii
+            or not self.compact
+            or has_special_floats(data)
+        )
+
+    def default(self, obj):
+        if isinstance(obj, JSONFragment):
+            return orjson.Fragment(obj.content)
+        value = self.encoder.default(obj)
+        if has_special_floats(value):
+            # orjson превращает исключение в JSONEncodeError, и ответ
+            # рендерит стандартный JSONRenderer.
+            raise ValueError("Float needs the stock JSON encoder")
+        return value
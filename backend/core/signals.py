@@ -0,0 +1,17 @@
+from django.core.signals import request_finished
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .db_pool import increment
+
+
+@receiver(connection_created)
+def count_opened_connection(sender, **kwargs):
+    """Учитывает новое соединение с БД."""
+    increment("opened")
+
+
+@receiver(request_finished)
+def count_finished_request(sender, **kwargs):
+    """Учитывает обработанный запрос."""
+    increment("requests")
@@ -0,0 +1,90 @@
+from django.db import connections, router, transaction
+from django.db.models.signals import post_save
+
+
+def bulk_insert_ignore(objs, returning="pk"):
+    """
+    Вставляет объекты одним INSERT ... ON CONFLICT DO NOTHING RETURNING.
+
+    Строки, которые уже есть в таблице, пропускаются без IntegrityError.
+    Возвращает значения поля returning только у строк, вставленных этим
+    запросом, поэтому при параллельных вставках каждая строка
+    учитывается один раз. Сигналы не отправляются. Нужен PostgreSQL или
+    SQLite 3.35+.
+    """
+    if not objs:
+        return []
+    model = type(objs[0])
+    connection = connections[router.db_for_write(model, instance=objs[0])]
+    quote_name = connection.ops.quote_name
+    fields = [
+        field for field in model._meta.concrete_fields if not field.primary_key
+    ]
+    returned = (
+        model._meta.pk
+        if returning == "pk"
+        else model._meta.get_field(returning)
+    )
+    columns = ", ".join(quote_name(field.column) for field in fields)
+    row = "({})".format(", ".join(["%s"] * len(fields)))
+    sql = (
+        f"INSERT INTO {quote_name(model._meta.db_table)} ({columns}) "
+        f"VALUES {', '.join([row] * len(objs))} "
+        f"ON CONFLICT DO NOTHING RETURNING {quote_name(returned.column)}"
+    )
+    params = [
+        field.get_db_prep_save(field.pre_save(obj, True), connection)
+        for obj in objs
+        for field in fields
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [value for value, in cursor.fetchall()]
+
+
+def insert_ignore(instance):
+    """
+    Вставляет объект, если такой строки ещё нет.
+
+    Возвращает True, если строка вставлена, и False, если такая уже
+    есть: повторный запрос не падает с IntegrityError. Вставленный
+    объект получает первичный ключ, и отправляется post_save, как при
+    save(). Из внутреннего состояния модели меняется только
+    документированный Model._state (adding и db), как это делает save().
+    """
+    model = type(instance)
+    using = router.db_for_write(model, instance=instance)
+    with transaction.atomic(using=using):
+        pks = bulk_insert_ignore([instance])
+        if not pks:
+            return False
+        instance.pk = pks[0]
+        instance._state.adding = False
+        instance._state.db = using
+        post_save.send(
+            sender=model,
+            instance=instance,
+            created=True,
+            update_fields=None,
+            raw=False,
+            using=using,
+        )
+    return True
+
+
+def delete_filtered(model, **fields):
+    """
+    Удаляет строки model с заданными значениями полей.
+
+    Это не один DELETE, а несколько запросов: строки блокируются
+    SELECT ... FOR UPDATE, затем каждая удаляется своим Model.delete()
+    (для уникальной пары — один DELETE). Зато post_delete получает
+    удалённые объекты и при параллельных удалениях одной строки
+    срабатывает один раз. Возвращает число удалённых строк.
+    """
+    queryset = model.objects.filter(**fields)
+    with transaction.atomic(using=queryset.db):
+        instances = list(queryset.select_for_update())
+        for instance in instances:
+            instance.delete()
+    return len(instances)
@@ -0,0 +1,22 @@
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from users.authentication import token_cache
+from .db_pool import get_pool_stats
+from .performance import histogram
+
+
+class MetricsView(APIView):
+    """Метрики процесса для персонала."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(
+            {
+                "database": get_pool_stats(),
+                "requests": histogram.snapshot(),
+                "token_cache": token_cache.stats(),
+            }
+        )
@@ -1,22 +1,23 @@
 from rest_framework import serializers
 
-from core.common_serializers import RecipeMinifiedSerializer
+from core.common_serializers import (
+    InsertIgnoreSerializerMixin,
+    RecipeMinifiedSerializer,
+)
 from .models import Favorite
 
 
-class FavoriteSerializer(serializers.ModelSerializer):
+class FavoriteSerializer(
+    InsertIgnoreSerializerMixin, serializers.ModelSerializer
+):
     """Сериализатор для избранных рецептов."""
 
+    unique_message = "Рецепт уже в избранном"
+
     class Meta:
         model = Favorite
         fields = ("user", "recipe")
-        validators = [
-            serializers.UniqueTogetherValidator(
-                queryset=Favorite.objects.all(),
-                fields=("user", "recipe"),
-                message="Рецепт уже в избранном",
-            )
-        ]
+        read_only_fields = ("user", "recipe")
 
     def to_representation(self, instance):
         return RecipeMinifiedSerializer(
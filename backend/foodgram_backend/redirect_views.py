@@ -1,9 +1,20 @@
-from django.shortcuts import get_object_or_404, redirect
+from django.http import Http404
+from django.shortcuts import redirect
 
-from recipes.models import Recipe
+from recipes.short_links import aresolve_short_link, resolve_short_link
 
 
 def recipe_short_link_redirect(request, short_link):
     """Редирект с короткой ссылки на страницу рецепта."""
-    recipe = get_object_or_404(Recipe, short_link=short_link)
-    return redirect(f"/recipes/{recipe.id}/")
+    recipe_id = resolve_short_link(short_link)
+    if recipe_id is None:
+        raise Http404
+    return redirect(f"/recipes/{recipe_id}/")
+
+
+async def async_recipe_short_link_redirect(request, short_link):
+    """Асинхронный вариант recipe_short_link_redirect."""
+    recipe_id = await aresolve_short_link(short_link)
+    if recipe_id is None:
+        raise Http404
+    return redirect(f"/recipes/{recipe_id}/")
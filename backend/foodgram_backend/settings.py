@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -13,6 +14,9 @@ DEBUG = os.getenv("DEBUG", "False").lower() == "true"
 
 ALLOWED_HOSTS = os.getenv("ALLOWED_HOSTS", "").split(",")
 
+SERVER_MODE = os.getenv("SERVER_MODE", "wsgi")
+ASYNC_READ_VIEWS = SERVER_MODE == "asgi"
+
 INSTALLED_APPS = [
     "django.contrib.admin",
     "django.contrib.auth",
@@ -70,9 +74,44 @@ DATABASES = {
         "PASSWORD": os.getenv("POSTGRES_PASSWORD", "postgres"),
         "HOST": os.getenv("DB_HOST", "db"),
         "PORT": os.getenv("DB_PORT", "5432"),
+        "CONN_MAX_AGE": 0,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {},
     }
 }
 
+# persistent — соединение на поток (только WSGI), pool — пул psycopg 3,
+# none — новое соединение на каждый запрос. Соединения перед выдачей
+# проверяются (CONN_HEALTH_CHECKS). Размеры пула описаны в README.
+DB_POOL_MODE = os.getenv(
+    "DB_POOL_MODE", "pool" if SERVER_MODE == "asgi" else "persistent"
+)
+
+if DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+    if DB_POOL_MODE == "pool":
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+        }
+    elif DB_POOL_MODE == "persistent" and SERVER_MODE != "asgi":
+        DATABASES["default"]["CONN_MAX_AGE"] = int(
+            os.getenv("DB_CONN_MAX_AGE", 60)
+        )
+elif DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+    # Транзакция сразу берёт блокировку записи: иначе параллельные
+    # SELECT ... FOR UPDATE и DELETE падают с "database is locked".
+    DATABASES["default"]["OPTIONS"]["transaction_mode"] = "IMMEDIATE"
+    # Тестовая БД в файле во временном каталоге: общая база в памяти
+    # блокирует таблицы, и запросы из параллельных потоков падают с
+    # "database table is locked".
+    DATABASES["default"]["TEST"] = {
+        "NAME": os.getenv(
+            "DB_TEST_NAME",
+            os.path.join(tempfile.gettempdir(), "foodgram_test.sqlite3"),
+        )
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -106,8 +145,108 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "users.authentication.CachedTokenAuthentication",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
+
+PAGINATION_MODE = os.getenv("PAGINATION_MODE", "page")
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
+SHARED_VERSION_CHECK_INTERVAL = float(
+    os.getenv("SHARED_VERSION_CHECK_INTERVAL", 1)
+)
+
+INGREDIENT_INDEX_TTL = int(os.getenv("INGREDIENT_INDEX_TTL", 300))
+
+RECIPE_CACHE = {
+    "BACKEND": os.getenv(
+        "RECIPE_CACHE_BACKEND", "core.caches.LocMemLRUBackend"
+    ),
+    "OPTIONS": {
+        "max_entries": int(os.getenv("RECIPE_CACHE_MAX_ENTRIES", 5000)),
+        "alias": os.getenv("RECIPE_CACHE_ALIAS", "default"),
+        "timeout": int(os.getenv("RECIPE_CACHE_TIMEOUT", 3600)),
+    },
+}
+
+SHORT_LINK_CACHE = {
+    "BACKEND": os.getenv(
+        "SHORT_LINK_CACHE_BACKEND", "core.caches.LocMemLRUBackend"
+    ),
+    "OPTIONS": {
+        "max_entries": int(os.getenv("SHORT_LINK_CACHE_MAX_ENTRIES", 10000)),
+        "alias": os.getenv("SHORT_LINK_CACHE_ALIAS", "default"),
+        "timeout": int(os.getenv("SHORT_LINK_CACHE_TIMEOUT", 300)),
+    },
+}
+
+# Записи кэша токенов в памяти процесса сверяются с поколением в кэше
+# Django TOKEN_CACHE_ALIAS. Если этот кэш общий, выход и смена пароля
+# видны всем процессам не позже чем через SHARED_VERSION_CHECK_INTERVAL
+# секунд, иначе — через TOKEN_CACHE_TIMEOUT секунд.
+TOKEN_CACHE = {
+    "BACKEND": os.getenv(
+        "TOKEN_CACHE_BACKEND", "core.caches.LocMemLRUBackend"
+    ),
+    "OPTIONS": {
+        "max_entries": int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", 10000)),
+        "alias": os.getenv("TOKEN_CACHE_ALIAS", "default"),
+        "timeout": int(os.getenv("TOKEN_CACHE_TIMEOUT", 5)),
+    },
+}
+
+SHOPPING_LIST_PDF_WORKERS = int(os.getenv("SHOPPING_LIST_PDF_WORKERS", 2))
+SHOPPING_LIST_PDF_TIMEOUT = int(os.getenv("SHOPPING_LIST_PDF_TIMEOUT", 30))
+SHOPPING_LIST_PDF_FONT = os.getenv(
+    "SHOPPING_LIST_PDF_FONT", "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+)
+
+# Рецепты авторов, у которых подписчиков не меньше этого числа, не
+# раскладываются по лентам при публикации, а подмешиваются при чтении.
+FEED_FANOUT_MAX_FOLLOWERS = int(os.getenv("FEED_FANOUT_MAX_FOLLOWERS", 1000))
+
+IMAGE_RENDITION_WORKERS = int(os.getenv("IMAGE_RENDITION_WORKERS", 2))
+IMAGE_RENDITION_QUEUE_SIZE = int(os.getenv("IMAGE_RENDITION_QUEUE_SIZE", 100))
+
+PERFORMANCE_METRICS = (
+    os.getenv("PERFORMANCE_METRICS", "False").lower() == "true"
+)
+PERFORMANCE_QUERY_BUDGET = int(os.getenv("PERFORMANCE_QUERY_BUDGET", 20))
+PERFORMANCE_TIME_BUDGET_MS = int(os.getenv("PERFORMANCE_TIME_BUDGET_MS", 500))
+
+if PERFORMANCE_METRICS:
+    MIDDLEWARE.insert(0, "core.middleware.PerformanceMiddleware")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "core.middleware": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
 }
 
 DJOSER = {
@@ -3,12 +3,23 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
-from .redirect_views import recipe_short_link_redirect
+from .redirect_views import (
+    async_recipe_short_link_redirect,
+    recipe_short_link_redirect,
+)
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("api.urls")),
-    path("s/<str:short_link>/", recipe_short_link_redirect, name="short-link"),
+    path(
+        "s/<str:short_link>/",
+        (
+            async_recipe_short_link_redirect
+            if settings.ASYNC_READ_VIEWS
+            else recipe_short_link_redirect
+        ),
+        name="short-link",
+    ),
 ]
 
 if settings.DEBUG:
@@ -11,16 +11,11 @@ class RecipeIngredientInline(admin.TabularInline):
 
 @admin.register(Recipe)
 class RecipeAdmin(admin.ModelAdmin):
-    list_display = ("name", "author", "get_favorites_count")
+    list_display = ("name", "author", "favorites_count")
     search_fields = ("name", "author__username")
     list_filter = ("author", "name")
     inlines = (RecipeIngredientInline,)
-    readonly_fields = ("get_favorites_count",)
-
-    def get_favorites_count(self, obj):
-        return obj.favorites.count()
-
-    get_favorites_count.short_description = "В избранном"
+    readonly_fields = ("favorites_count", "shopping_cart_count")
 
 
 @admin.register(Ingredient)
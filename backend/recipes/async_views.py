@@ -0,0 +1,155 @@
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.db.models import aprefetch_related_objects
+from django.http import Http404
+from django.shortcuts import aget_object_or_404
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import permissions
+from rest_framework.settings import api_settings
+
+from core.async_views import AsyncReadView
+from core.conditional import etag_matches, not_modified, set_etag
+from core.pagination import FeedPagination
+from core.permissions import IsOwnerOrReadOnly
+from .filters import IngredientFilter, RecipeFilter
+from .ingredient_index import ingredient_index
+from .etags import get_page_envelope, make_recipes_etag
+from .models import IngredientCatalog, Recipe, get_recipe_prefetches
+from .renderers import SHOPPING_LIST_RENDERER_CLASSES, PlainTextRenderer
+from .serializers import IngredientSerializer, RecipeListSerializer
+from .shopping_list import (
+    ROWS_CHUNK_SIZE,
+    SHOPPING_LIST_STREAMS,
+    aget_pdf,
+    aiter_stream,
+    get_shopping_list_rows,
+    iter_file,
+    make_attachment,
+)
+
+
+class AsyncIngredientSearchView(AsyncReadView):
+    """
+    Асинхронный поиск ингредиентов по названию.
+
+    Полный справочник и изменения по since отдаёт IngredientViewSet.
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def is_delegated(self, request):
+        return super().is_delegated(request) or not request.GET.get(
+            IngredientFilter.search_param
+        )
+
+    async def get(self, request):
+        ingredients = await ingredient_index.asearch(
+            request.query_params[IngredientFilter.search_param]
+        )
+        return IngredientSerializer(ingredients, many=True).data
+
+
+class AsyncRecipeListView(AsyncReadView):
+    """Асинхронный список рецептов с фильтрами RecipeViewSet."""
+
+    permission_classes = [IsOwnerOrReadOnly]
+    filterset_class = RecipeFilter
+
+    def get_queryset(self, request):
+        return Recipe.objects.with_user_flags(request.user).with_author_state(
+            request.user
+        )
+
+    def get_serializer_context(self, request, catalog_version):
+        return {
+            "request": request,
+            "view": self,
+            "ingredient_catalog_version": catalog_version,
+        }
+
+    async def get(self, request):
+        queryset = await sync_to_async(DjangoFilterBackend().filter_queryset)(
+            request, self.get_queryset(request), self
+        )
+        paginator = FeedPagination()
+        page = await paginator.apaginate_queryset(queryset, request, self)
+        catalog = await IngredientCatalog.aget_current()
+        etag = make_recipes_etag(
+            request, page, catalog.version, get_page_envelope(paginator)
+        )
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        await aprefetch_related_objects(
+            page, *get_recipe_prefetches(request.user)
+        )
+        serializer = RecipeListSerializer(
+            page,
+            many=True,
+            context=self.get_serializer_context(request, catalog.version),
+        )
+        response = paginator.get_paginated_response(serializer.data)
+        return set_etag(self.render(response.data), etag)
+
+
+class AsyncRecipeDetailView(AsyncRecipeListView):
+    """Асинхронное получение рецепта."""
+
+    async def get(self, request, pk):
+        try:
+            recipe = await aget_object_or_404(
+                self.get_queryset(request), pk=pk
+            )
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        catalog = await IngredientCatalog.aget_current()
+        etag = make_recipes_etag(request, [recipe], catalog.version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        await aprefetch_related_objects(
+            [recipe], *get_recipe_prefetches(request.user)
+        )
+        serializer = RecipeListSerializer(
+            recipe,
+            context=self.get_serializer_context(request, catalog.version),
+        )
+        return set_etag(self.render(serializer.data), etag)
+
+
+class AsyncShoppingListView(AsyncReadView):
+    """
+    Асинхронное скачивание списка покупок.
+
+    Файл отдаётся асинхронным потоком, поэтому память не растёт с
+    размером списка. PDF строится в пуле pdf_executor, и его ожидание
+    не занимает поток. Форматы и ошибки те же, что у
+    RecipeViewSet.download_shopping_cart.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def is_delegated(self, request):
+        return request.method != "GET"
+
+    def initial(self, request):
+        # Как в DRF, неизвестный format и Accept отклоняются до
+        # аутентификации.
+        api_settings.DEFAULT_CONTENT_NEGOTIATION_CLASS().select_renderer(
+            request,
+            [renderer() for renderer in SHOPPING_LIST_RENDERER_CLASSES],
+        )
+        super().initial(request)
+
+    async def get(self, request):
+        file_format = request.query_params.get(
+            "format", PlainTextRenderer.format
+        )
+        if file_format == "pdf":
+            output = await aget_pdf(request.user)
+            return make_attachment(aiter_stream(iter_file(output), 1), "pdf")
+        rows = get_shopping_list_rows(request.user)
+        return make_attachment(
+            aiter_stream(
+                SHOPPING_LIST_STREAMS[file_format](rows), ROWS_CHUNK_SIZE
+            ),
+            file_format,
+        )
@@ -0,0 +1,31 @@
+import threading
+
+from core.renderers import FastJSONRenderer
+from .models import Ingredient
+from .serializers import IngredientSerializer
+
+_lock = threading.Lock()
+_rendered = {"version": None, "content": b""}
+
+
+def render_ingredients(queryset):
+    """Рендерит ингредиенты в JSON так же, как это делает DRF."""
+    return FastJSONRenderer().render(
+        IngredientSerializer(queryset, many=True).data
+    )
+
+
+def get_catalog_content(version):
+    """
+    Возвращает весь справочник ингредиентов в виде готовых байтов JSON.
+
+    Результат хранится в памяти процесса, пока не сменится версия.
+    Версию нужно читать до вызова: тогда данные не старее версии.
+    """
+    with _lock:
+        if _rendered["version"] != version:
+            _rendered["content"] = render_ingredients(
+                Ingredient.objects.all()
+            )
+            _rendered["version"] = version
+        return _rendered["content"]
@@ -0,0 +1,44 @@
+from core.conditional import make_etag
+
+
+def get_recipe_state(recipe):
+    """
+    Значения, от которых зависит представление рецепта.
+
+    Версия рецепта растёт при изменении полей и ингредиентов; счётчики,
+    флаги пользователя и автор меняются без неё. Рецепт должен быть
+    получен с with_user_flags и with_author_state.
+    """
+    return [
+        recipe.pk,
+        recipe.version,
+        recipe.favorites_count,
+        recipe.shopping_cart_count,
+        recipe.is_favorited,
+        recipe.is_in_shopping_cart,
+        recipe.author_id,
+        recipe.author_version,
+        recipe.author_is_subscribed,
+    ]
+
+
+def make_recipes_etag(request, recipes, catalog_version, envelope=None):
+    """
+    ETag одного рецепта или страницы списка.
+
+    envelope — данные страницы без results (число рецептов и ссылки).
+    Версия справочника учитывает переименование ингредиентов, базовый
+    URL — абсолютные ссылки на изображения.
+    """
+    return make_etag(
+        request.build_absolute_uri("/"),
+        catalog_version,
+        envelope,
+        [get_recipe_state(recipe) for recipe in recipes],
+    )
+
+
+def get_page_envelope(paginator):
+    envelope = dict(paginator.get_paginated_response([]).data)
+    envelope.pop("results")
+    return envelope
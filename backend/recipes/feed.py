@@ -0,0 +1,116 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+
+from core.constants import FEED_BACKFILL_SIZE, FEED_BATCH_SIZE
+from users.models import Subscription
+from .models import FeedEntry, Recipe
+
+User = get_user_model()
+
+
+def should_fan_out(author_id):
+    """Раскладывать ли рецепты автора по лентам при публикации."""
+    followers_count = (
+        User.objects.filter(pk=author_id)
+        .values_list("followers_count", flat=True)
+        .first()
+    )
+    return (
+        followers_count is not None
+        and followers_count < settings.FEED_FANOUT_MAX_FOLLOWERS
+    )
+
+
+def fan_out_recipe(recipe):
+    """
+    Добавляет новый рецепт в ленты подписчиков автора.
+
+    Флаг fanned_out ставится после записи в ленты: до этого рецепт
+    подмешивается в ленты при чтении.
+    """
+    if not should_fan_out(recipe.author_id):
+        return
+    follower_ids = Subscription.objects.filter(
+        author_id=recipe.author_id
+    ).values_list("user_id", flat=True)
+    FeedEntry.objects.bulk_create(
+        (
+            FeedEntry(
+                user_id=user_id,
+                recipe_id=recipe.pk,
+                author_id=recipe.author_id,
+            )
+            for user_id in follower_ids.iterator()
+        ),
+        batch_size=FEED_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    Recipe.objects.filter(pk=recipe.pk).update(fanned_out=True)
+
+
+def backfill_feeds(subscriptions):
+    """
+    Заполняет ленты последними рецептами авторов из подписок.
+
+    subscriptions — пары (подписчик, автор). Для каждого автора берётся
+    не больше FEED_BACKFILL_SIZE последних рецептов одним запросом с
+    оконной функцией. Берутся только рецепты с флагом fanned_out:
+    остальные подмешиваются при чтении.
+    """
+    followers = defaultdict(list)
+    for user_id, author_id in subscriptions:
+        followers[author_id].append(user_id)
+    recent = (
+        Recipe.objects.filter(author_id__in=followers, fanned_out=True)
+        .annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=F("author_id"),
+                order_by=[F("pub_date").desc(), F("id").desc()],
+            )
+        )
+        .filter(position__lte=FEED_BACKFILL_SIZE)
+        .values_list("pk", "author_id")
+    )
+    FeedEntry.objects.bulk_create(
+        [
+            FeedEntry(
+                user_id=user_id, recipe_id=recipe_id, author_id=author_id
+            )
+            for recipe_id, author_id in recent
+            for user_id in followers[author_id]
+        ],
+        batch_size=FEED_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def prune_feed(user_id, author_id):
+    """Убирает из ленты рецепты автора, от которого пользователь отписался."""
+    FeedEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def filter_feed(queryset, user):
+    """
+    Оставляет в queryset рецепты из ленты пользователя.
+
+    Лента — это записи FeedEntry, объединённые с рецептами авторов из
+    подписок, которые не раскладывались по лентам (fanned_out=False).
+    Флаг хранится у рецепта, а не вычисляется по текущему числу
+    подписчиков, поэтому рецепт не пропадает из ленты, когда автор
+    пересекает порог FEED_FANOUT_MAX_FOLLOWERS. Оба условия — подзапросы
+    по индексам, поэтому строки рецептов не размножаются соединениями.
+    """
+    return queryset.filter(
+        Q(pk__in=FeedEntry.objects.filter(user=user).values("recipe_id"))
+        | Q(
+            fanned_out=False,
+            author_id__in=Subscription.objects.filter(user=user).values(
+                "author_id"
+            ),
+        )
+    )
@@ -1,11 +1,22 @@
+from django import forms
+from django.db.models import Count
 from django_filters import rest_framework as filters
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import SearchFilter
 
-from .models import Recipe
+from core.constants import MAX_FILTER_INGREDIENTS
+
+from .ingredient_index import ingredient_index
+from .models import Recipe, RecipeIngredient
+from .search import get_search_backend
 
 
 class IngredientFilter(SearchFilter):
-    """Фильтр для поиска ингредиентов по названию."""
+    """
+    Фильтр для поиска ингредиентов по названию.
+
+    Список ищется по индексу в памяти процесса без обращения к базе.
+    """
 
     search_param = "name"
 
@@ -14,14 +25,34 @@ class IngredientFilter(SearchFilter):
 
     def filter_queryset(self, request, queryset, view):
         name = request.query_params.get(self.search_param)
-        if name:
-            return queryset.filter(name__startswith=name)
-        return queryset
+        if not name:
+            return queryset
+        if getattr(view, "action", None) == "list":
+            return ingredient_index.search(name)
+        return queryset.filter(name__icontains=name)
+
+
+class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+    """Список целых чисел через запятую."""
+
+    field_class = forms.IntegerField
 
 
 class RecipeFilter(filters.FilterSet):
-    """Фильтр для рецептов."""
+    """
+    Фильтр для рецептов.
+
+    search ищет по названию, описанию и ингредиентам через полнотекстовый
+    индекс и сортирует результаты по релевантности. Фильтры по
+    ингредиентам — это подзапросы к RecipeIngredient по индексу
+    (ingredient, recipe), а не соединения с таблицей рецептов.
+    """
 
+    search = filters.CharFilter(method="filter_search")
+    ingredients_all = NumberInFilter(method="filter_ingredients_all")
+    ingredients_any = NumberInFilter(method="filter_ingredients_any")
+    ingredients_exclude = NumberInFilter(method="filter_ingredients_exclude")
+    cooking_time = filters.RangeFilter()
     is_favorited = filters.BooleanFilter(method="filter_is_favorited")
     is_in_shopping_cart = filters.BooleanFilter(
         method="filter_is_in_shopping_cart"
@@ -29,7 +60,62 @@ class RecipeFilter(filters.FilterSet):
 
     class Meta:
         model = Recipe
-        fields = ["author", "is_favorited", "is_in_shopping_cart"]
+        fields = [
+            "author",
+            "is_favorited",
+            "is_in_shopping_cart",
+            "search",
+            "ingredients_all",
+            "ingredients_any",
+            "ingredients_exclude",
+            "cooking_time",
+        ]
+
+    def filter_search(self, queryset, name, value):
+        return get_search_backend().search(queryset, value)
+
+    def get_ingredient_ids(self, name, value):
+        ingredient_ids = set(value)
+        if len(ingredient_ids) > MAX_FILTER_INGREDIENTS:
+            raise ValidationError(
+                {
+                    name: "Можно указать не больше "
+                    f"{MAX_FILTER_INGREDIENTS} ингредиентов"
+                }
+            )
+        return ingredient_ids
+
+    def recipes_with_ingredients(self, ingredient_ids):
+        return RecipeIngredient.objects.filter(
+            ingredient_id__in=ingredient_ids
+        ).values("recipe_id")
+
+    def filter_ingredients_all(self, queryset, name, value):
+        ingredient_ids = self.get_ingredient_ids(name, value)
+        if not ingredient_ids:
+            return queryset
+        return queryset.filter(
+            pk__in=self.recipes_with_ingredients(ingredient_ids)
+            .annotate(matched=Count("ingredient_id"))
+            .filter(matched=len(ingredient_ids))
+            .values("recipe_id")
+        )
+
+    def filter_ingredients_any(self, queryset, name, value):
+        ingredient_ids = self.get_ingredient_ids(name, value)
+        if not ingredient_ids:
+            return queryset
+        return queryset.filter(
+            pk__in=self.recipes_with_ingredients(ingredient_ids)
+        )
+
+    def filter_ingredients_exclude(self, queryset, name, value):
+        ingredient_ids = self.get_ingredient_ids(name, value)
+        if not ingredient_ids:
+            return queryset
+        return queryset.exclude(
+            pk__in=self.recipes_with_ingredients(ingredient_ids)
+        )
 
     def filter_is_favorited(self, queryset, name, value):
         user = self.request.user
@@ -0,0 +1,118 @@
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import namedtuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from core.caches import SharedVersion
+from .models import Ingredient
+
+INDEX_VERSION_CACHE_KEY = "recipes:ingredient_index:version"
+PREFIX_UPPER_BOUND = chr(sys.maxunicode)
+
+IndexSnapshot = namedtuple(
+    "IndexSnapshot",
+    ["entries", "names", "keys", "positions", "version", "built_at"],
+)
+
+
+class IngredientIndex:
+    """
+    Индекс ингредиентов в памяти процесса для автодополнения.
+
+    Хранит все ингредиенты в порядке Ingredient.Meta.ordering и
+    отсортированный список названий в нижнем регистре, по которому
+    префикс ищется бинарным поиском. Индекс перестраивается лениво:
+    после сигнала об изменении ингредиентов, смены общей версии или по
+    истечении TTL. Версия перечитывается из кэша не чаще раза в
+    SHARED_VERSION_CHECK_INTERVAL секунд; другие процессы видят её
+    смену, только если кэш Django общий.
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self.version = SharedVersion(INDEX_VERSION_CACHE_KEY)
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    def invalidate(self):
+        """Помечает индекс устаревшим во всех процессах."""
+        self._snapshot = None
+        self.version.bump()
+
+    def is_stale(self, snapshot, version):
+        if snapshot is None:
+            return True
+        ttl = settings.INGREDIENT_INDEX_TTL if self.ttl is None else self.ttl
+        if ttl and time.monotonic() - snapshot.built_at > ttl:
+            return True
+        return version != snapshot.version
+
+    def build(self, version):
+        entries = list(
+            Ingredient.objects.order_by(*Ingredient._meta.ordering, "pk")
+        )
+        names = [ingredient.name.casefold() for ingredient in entries]
+        keys = sorted((name, position) for position, name in enumerate(names))
+        return IndexSnapshot(
+            entries=entries,
+            names=names,
+            keys=[key for key, _ in keys],
+            positions=[position for _, position in keys],
+            version=version,
+            built_at=time.monotonic(),
+        )
+
+    def get_snapshot(self):
+        version = self.version.get()
+        snapshot = self._snapshot
+        if self.is_stale(snapshot, version):
+            with self._lock:
+                snapshot = self._snapshot
+                if self.is_stale(snapshot, version):
+                    snapshot = self._snapshot = self.build(version)
+        return snapshot
+
+    async def aget_snapshot(self):
+        """Асинхронный вариант get_snapshot: индекс строится вне event loop."""
+        version = await self.version.aget()
+        snapshot = self._snapshot
+        if self.is_stale(snapshot, version):
+            snapshot = await sync_to_async(self.get_snapshot)()
+        return snapshot
+
+    def search(self, query):
+        """
+        Возвращает ингредиенты, название которых содержит query.
+
+        Сначала идут совпадения по началу названия, затем остальные
+        вхождения; внутри каждой группы сохраняется порядок модели.
+        Регистр не учитывается.
+        """
+        return self.find(self.get_snapshot(), query)
+
+    async def asearch(self, query):
+        """Асинхронный вариант search."""
+        return self.find(await self.aget_snapshot(), query)
+
+    def find(self, snapshot, query):
+        query = query.casefold()
+
+        start = bisect_left(snapshot.keys, query)
+        end = bisect_left(snapshot.keys, query + PREFIX_UPPER_BOUND, start)
+        prefix_matches = [
+            snapshot.entries[position]
+            for position in sorted(snapshot.positions[start:end])
+        ]
+        substring_matches = [
+            snapshot.entries[position]
+            for position, name in enumerate(snapshot.names)
+            if query in name and not name.startswith(query)
+        ]
+        return prefix_matches + substring_matches
+
+
+ingredient_index = IngredientIndex()
@@ -0,0 +1,211 @@
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from rest_framework.authtoken.models import Token
+
+from recipes.ingredient_index import ingredient_index
+from recipes.models import Recipe
+from recipes.short_links import get_recipe_short_link
+
+User = get_user_model()
+
+SERVER_MODES = ("wsgi", "asgi")
+STARTUP_TIMEOUT = 30
+
+
+def percentile(values, fraction):
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare RPS and latency of the read endpoints served by gunicorn "
+        "with sync (WSGI) and uvicorn (ASGI) workers"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=2,
+            help="Number of gunicorn workers in both modes",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=32,
+            help="Number of concurrent client connections",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=10,
+            help="Seconds of load per mode",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=float,
+            default=2,
+            help="Seconds of load before measuring",
+        )
+        parser.add_argument("--port", type=int, default=8100)
+        parser.add_argument(
+            "--modes",
+            nargs="+",
+            choices=SERVER_MODES,
+            default=list(SERVER_MODES),
+        )
+
+    def handle(self, *args, **options):
+        paths = self.get_paths()
+        headers = {
+            "Authorization": f"Token {self.get_token()}",
+            "Accept": "application/json",
+            "Host": self.get_host(),
+        }
+        results = {}
+        for mode in options["modes"]:
+            server = self.start_server(mode, options)
+            try:
+                self.run_load(paths, headers, options, options["warmup"])
+                results[mode] = self.run_load(
+                    paths, headers, options, options["duration"]
+                )
+            finally:
+                server.terminate()
+                server.wait()
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def get_paths(self):
+        recipe = Recipe.objects.first()
+        if recipe is None:
+            raise CommandError("There are no recipes to benchmark")
+        ingredient = ingredient_index.get_snapshot().entries[:1]
+        query = ingredient[0].name[:2] if ingredient else "a"
+        return [
+            "/api/recipes/",
+            f"/api/recipes/{recipe.pk}/",
+            f"/api/ingredients/?{urlencode({'name': query})}",
+            "/api/users/subscriptions/?recipes_limit=3",
+            f"/s/{get_recipe_short_link(recipe)}/",
+        ]
+
+    def get_token(self):
+        user = (
+            User.objects.annotate(follows=Count("follower"))
+            .order_by("-follows")
+            .first()
+        )
+        if user is None:
+            raise CommandError("There are no users to benchmark")
+        token, _ = Token.objects.get_or_create(user=user)
+        return token.key
+
+    def get_host(self):
+        hosts = [host for host in settings.ALLOWED_HOSTS if host]
+        if not hosts or hosts[0] == "*":
+            return "localhost"
+        return hosts[0].lstrip(".")
+
+    def start_server(self, mode, options):
+        env = {
+            **os.environ,
+            "SERVER_MODE": mode,
+            "GUNICORN_WORKERS": str(options["workers"]),
+            "GUNICORN_BIND": f"127.0.0.1:{options['port']}",
+        }
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py"],
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"gunicorn exited in {mode} mode")
+            try:
+                socket.create_connection(
+                    ("127.0.0.1", options["port"]), timeout=1
+                ).close()
+                return server
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError(f"gunicorn did not start in {mode} mode")
+
+    def run_load(self, paths, headers, options, duration):
+        deadline = time.monotonic() + duration
+
+        def client(offset):
+            connection = http.client.HTTPConnection(
+                "127.0.0.1", options["port"], timeout=30
+            )
+            samples = []
+            index = offset
+            while time.monotonic() < deadline:
+                path = paths[index % len(paths)]
+                index += 1
+                started = time.perf_counter()
+                try:
+                    connection.request("GET", path, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    status = response.status
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    status = None
+                samples.append((path, status, time.perf_counter() - started))
+            connection.close()
+            return samples
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(options["concurrency"]) as executor:
+            samples = [
+                sample
+                for client_samples in executor.map(
+                    client, range(options["concurrency"])
+                )
+                for sample in client_samples
+            ]
+        elapsed = time.monotonic() - started
+
+        report = self.summarize(samples, elapsed)
+        report["paths"] = {
+            path: self.summarize(
+                [sample for sample in samples if sample[0] == path], elapsed
+            )
+            for path in paths
+        }
+        return report
+
+    def summarize(self, samples, elapsed):
+        timings = sorted(duration for _, _, duration in samples)
+        errors = sum(
+            1
+            for _, status, _ in samples
+            if status is None or status >= 400
+        )
+        if not timings:
+            return {"requests": 0, "errors": errors}
+        return {
+            "requests": len(timings),
+            "errors": errors,
+            "rps": len(timings) / elapsed,
+            "mean_ms": statistics.fmean(timings) * 1000,
+            "p50_ms": percentile(timings, 0.5) * 1000,
+            "p99_ms": percentile(timings, 0.99) * 1000,
+        }
@@ -0,0 +1,71 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from foodgram_backend.redirect_views import recipe_short_link_redirect
+from recipes.models import Recipe
+from recipes.short_links import encode_recipe_id, short_link_cache
+
+
+class Command(BaseCommand):
+    help = "Measure short link redirect latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=1000,
+            help="Number of redirects measured per kind of link",
+        )
+        parser.add_argument(
+            "--recipes",
+            type=int,
+            default=100,
+            help="Number of recipes whose links are requested",
+        )
+
+    def handle(self, *args, **options):
+        recipes = list(
+            Recipe.objects.values("id", "short_link")[: options["recipes"]]
+        )
+        if not recipes:
+            raise CommandError("There are no recipes to benchmark")
+
+        codes = {
+            "computed": [encode_recipe_id(recipe["id"]) for recipe in recipes],
+            "legacy": [
+                recipe["short_link"]
+                for recipe in recipes
+                if recipe["short_link"]
+            ],
+        }
+        short_link_cache.clear()
+        results = {
+            kind: self.measure(kind_codes, options["iterations"])
+            for kind, kind_codes in codes.items()
+            if kind_codes
+        }
+        results["cache"] = short_link_cache.stats()
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def measure(self, codes, iterations):
+        factory = RequestFactory()
+        timings = []
+        for index in range(iterations):
+            code = codes[index % len(codes)]
+            request = factory.get(f"/s/{code}/")
+            started = time.perf_counter()
+            response = recipe_short_link_redirect(request, code)
+            timings.append(time.perf_counter() - started)
+            if response.status_code != 302:
+                raise CommandError(f"Unexpected response for {code}")
+        timings.sort()
+        return {
+            "iterations": iterations,
+            "mean_us": statistics.fmean(timings) * 1e6,
+            "p50_us": timings[len(timings) // 2] * 1e6,
+            "p99_us": timings[int(len(timings) * 0.99)] * 1e6,
+        }
@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from core.images import build_renditions, has_renditions
+from recipes.models import Recipe
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Build missing thumbnails of recipe images and avatars"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Rebuild thumbnails that already exist",
+        )
+
+    def handle(self, *args, **options):
+        targets = (
+            (Recipe, "image", {"version": F("version") + 1}),
+            (User, "avatar", {"version": F("version") + 1}),
+        )
+        for model, field_name, extra_updates in targets:
+            built = 0
+            queryset = (
+                model.objects.exclude(**{field_name: ""})
+                .exclude(**{f"{field_name}__isnull": True})
+                .only("pk", field_name, f"{field_name}_renditions")
+            )
+            for instance in queryset.iterator():
+                if not options["force"] and has_renditions(
+                    instance, field_name
+                ):
+                    continue
+                build_renditions(
+                    model,
+                    instance.pk,
+                    field_name,
+                    getattr(instance, field_name).name,
+                    extra_updates,
+                )
+                built += 1
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{model._meta.verbose_name_plural}: {built} built"
+                )
+            )
@@ -1,10 +1,93 @@
 import csv
+import hashlib
+import io
 import json
+from itertools import islice
 from pathlib import Path
 
 from django.core.management.base import BaseCommand
+from django.db import connection, transaction
 
-from recipes.models import Ingredient
+from core.constants import (
+    INGREDIENTS_BATCH_SIZE,
+    MAX_INGREDIENT_NAME_LENGTH,
+    MAX_MEASUREMENT_UNIT_NAME_LENGTH,
+)
+from recipes.ingredient_index import ingredient_index
+from recipes.models import Ingredient, IngredientCatalog
+
+READ_CHUNK_SIZE = 64 * 1024
+CSV_HEADER = ["name", "measurement_unit"]
+JSON_WHITESPACE = " \t\r\n"
+SEPARATORS = "," + JSON_WHITESPACE
+
+
+def read_chunk(file):
+    chunk = file.read(READ_CHUNK_SIZE)
+    if not chunk:
+        raise ValueError("Unexpected end of JSON file")
+    return chunk
+
+
+def read_array_start(file):
+    """Читает файл до открывающей скобки массива и возвращает остаток."""
+    buffer = ""
+    while not buffer:
+        buffer = read_chunk(file).lstrip(JSON_WHITESPACE)
+    if buffer[0] != "[":
+        raise ValueError("JSON file must contain an array")
+    return buffer[1:]
+
+
+def decode_items(decoder, buffer, position):
+    """
+    Декодирует целые элементы массива из buffer, начиная с position.
+
+    Возвращает элементы, позицию первого неразобранного символа и
+    признак конца массива. Элемент принимается, только если за ним в
+    буфере уже видна запятая или конец массива: иначе число могло
+    оборваться на границе чтения.
+    """
+    items = []
+    while True:
+        position = skip(buffer, position, SEPARATORS)
+        if position < len(buffer) and buffer[position] == "]":
+            return items, position, True
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            return items, position, False
+        following = skip(buffer, end, JSON_WHITESPACE)
+        if following == len(buffer) or buffer[following] not in ",]":
+            return items, position, False
+        items.append(item)
+        position = end
+
+
+def skip(buffer, position, chars):
+    while position < len(buffer) and buffer[position] in chars:
+        position += 1
+    return position
+
+
+def iter_json_array(file):
+    """Поэлементно разбирает JSON-массив, не загружая файл целиком."""
+    decoder = json.JSONDecoder()
+    buffer = read_array_start(file)
+    position = 0
+    while True:
+        items, position, closed = decode_items(decoder, buffer, position)
+        yield from items
+        if closed:
+            return
+        buffer = buffer[position:] + read_chunk(file)
+        position = 0
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
 
 
 class Command(BaseCommand):
@@ -19,6 +102,17 @@ class Command(BaseCommand):
             choices=["json", "csv"],
             help="Format of the data file (json or csv)",
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=INGREDIENTS_BATCH_SIZE,
+            help="Number of ingredients inserted per statement",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Load the file even if its checksum has not changed",
+        )
 
     def handle(self, *args, **options):
         path = options.get("path")
@@ -32,34 +126,131 @@ class Command(BaseCommand):
         file_format = options.get("format")
 
         try:
-            if file_format == "json":
-                self.load_from_json(path)
-            elif file_format == "csv":
-                self.load_from_csv(path)
+            checksum = self.get_checksum(path)
+            catalog = IngredientCatalog.get_current()
+            if not options["force"] and catalog.source_checksum == checksum:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        "Ingredients file is unchanged, skipping load"
+                    )
+                )
+                return
+
+            with open(path, "r", encoding="utf-8") as file:
+                if file_format == "json":
+                    rows = self.read_json(file)
+                elif file_format == "csv":
+                    rows = self.read_csv(file)
+                created = self.load(
+                    self.deduplicate(rows), options["batch_size"], checksum
+                )
+            if created:
+                ingredient_index.invalidate()
 
             self.stdout.write(
-                self.style.SUCCESS("Ingredients were successfully loaded")
+                self.style.SUCCESS(
+                    f"Ingredients were successfully loaded ({created} new)"
+                )
             )
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(f"Error loading ingredients: {str(e)}")
             )
 
-    def load_from_json(self, path):
-        with open(path, "r", encoding="utf-8") as file:
-            data = json.load(file)
-            for item in data:
-                Ingredient.objects.get_or_create(
-                    name=item["name"],
-                    measurement_unit=item["measurement_unit"],
+    def get_checksum(self, path):
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            while chunk := file.read(READ_CHUNK_SIZE):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def read_json(self, file):
+        for item in iter_json_array(file):
+            yield item["name"], item["measurement_unit"]
+
+    def read_csv(self, file):
+        for row in csv.reader(file):
+            if len(row) >= 2 and row[:2] != CSV_HEADER:
+                yield row[0], row[1]
+
+    def deduplicate(self, rows):
+        seen = set()
+        for name, measurement_unit in rows:
+            key = (name.strip(), measurement_unit.strip())
+            if key[0] and key[1] and key not in seen:
+                seen.add(key)
+                yield key
+
+    @transaction.atomic
+    def load(self, rows, batch_size, checksum):
+        """
+        Вставляет новые ингредиенты пачками и возвращает их число.
+
+        Существующие пары (название, единица) пропускаются благодаря
+        ограничению unique_ingredient. Все новые ингредиенты получают одну
+        новую версию справочника; если новых нет, версия не меняется.
+        """
+        catalog = IngredientCatalog.get_for_update()
+        count_before = Ingredient.objects.count()
+        version = catalog.version + 1
+        if self.supports_copy():
+            self.copy_rows(rows, batch_size, version)
+        else:
+            for batch in batched(rows, batch_size):
+                Ingredient.objects.bulk_create(
+                    [
+                        Ingredient(
+                            name=name,
+                            measurement_unit=measurement_unit,
+                            version=version,
+                        )
+                        for name, measurement_unit in batch
+                    ],
+                    ignore_conflicts=True,
                 )
+        created = Ingredient.objects.count() - count_before
+        catalog.source_checksum = checksum
+        update_fields = ["source_checksum"]
+        if created:
+            catalog.version = version
+            update_fields.append("version")
+        catalog.save(update_fields=update_fields)
+        return created
 
-    def load_from_csv(self, path):
-        with open(path, "r", encoding="utf-8") as file:
-            reader = csv.reader(file)
-            next(reader, None)
-            for row in reader:
-                if len(row) >= 2:
-                    Ingredient.objects.get_or_create(
-                        name=row[0], measurement_unit=row[1]
-                    )
+    def supports_copy(self):
+        return connection.vendor == "postgresql"
+
+    def copy_rows(self, rows, batch_size, version):
+        """Загружает строки через COPY во временную таблицу (PostgreSQL)."""
+        table = connection.ops.quote_name(Ingredient._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMPORARY TABLE ingredient_staging ("
+                f"name varchar({MAX_INGREDIENT_NAME_LENGTH}), "
+                "measurement_unit "
+                f"varchar({MAX_MEASUREMENT_UNIT_NAME_LENGTH})"
+                ") ON COMMIT DROP"
+            )
+            for batch in batched(rows, batch_size):
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(batch)
+                self.copy_buffer(cursor.cursor, buffer)
+            cursor.execute(
+                f"INSERT INTO {table} (name, measurement_unit, version) "
+                "SELECT name, measurement_unit, %s FROM ingredient_staging "
+                "ON CONFLICT (name, measurement_unit) DO NOTHING",
+                [version],
+            )
+
+    def copy_buffer(self, cursor, buffer):
+        """Передаёт CSV в COPY средствами psycopg 3 или psycopg2."""
+        sql = (
+            "COPY ingredient_staging (name, measurement_unit) "
+            "FROM STDIN WITH (FORMAT csv)"
+        )
+        if hasattr(cursor, "copy"):
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+        else:
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.constants import FEED_BATCH_SIZE
+from recipes.feed import backfill_feeds
+from recipes.models import FeedEntry
+from users.models import Subscription
+
+
+class Command(BaseCommand):
+    help = "Fill subscription feeds from existing subscriptions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete all feed entries before filling",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options["clear"]:
+            FeedEntry.objects.all().delete()
+        count_before = FeedEntry.objects.count()
+        last_pk = 0
+        while batch := list(
+            Subscription.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", "user_id", "author_id")[:FEED_BATCH_SIZE]
+        ):
+            backfill_feeds(
+                [(user_id, author_id) for _, user_id, author_id in batch]
+            )
+            last_pk = batch[-1][0]
+        created = FeedEntry.objects.count() - count_before
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Feeds were filled with {created} entries in {elapsed:.1f} s"
+            )
+        )
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+
+from recipes.models import Recipe
+from recipes.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild full-text search documents of recipes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10_000,
+            help="Number of recipe ids updated per statement",
+        )
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        bounds = Recipe.objects.aggregate(first=Min("pk"), last=Max("pk"))
+        if bounds["first"] is None:
+            self.stdout.write("There are no recipes to index")
+            return
+        started = time.perf_counter()
+        batch_size = options["batch_size"]
+        for start in range(bounds["first"], bounds["last"] + 1, batch_size):
+            backend.update(
+                Recipe.objects.filter(pk__gte=start, pk__lt=start + batch_size)
+            )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Search index was rebuilt in {elapsed:.1f} s "
+                f"(ids {bounds['first']}-{bounds['last']})"
+            )
+        )
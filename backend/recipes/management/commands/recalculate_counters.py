@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from favorites.models import Favorite
+from recipes.models import Recipe
+from shopping_cart.models import ShoppingCart
+from users.models import Subscription
+
+User = get_user_model()
+
+COUNTERS = (
+    (Recipe, "favorites_count", Favorite, "recipe"),
+    (Recipe, "shopping_cart_count", ShoppingCart, "recipe"),
+    (User, "recipes_count", Recipe, "author"),
+    (User, "followers_count", Subscription, "author"),
+)
+
+
+def count_subquery(model, fk_name):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{fk_name: OuterRef("pk")})
+            .order_by()
+            .values(fk_name)
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+class Command(BaseCommand):
+    help = "Recalculate denormalized counters and repair drifted rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report drifted rows without fixing them",
+        )
+
+    def handle(self, *args, **options):
+        for model, field, related_model, fk_name in COUNTERS:
+            actual = count_subquery(related_model, fk_name)
+            with transaction.atomic():
+                drifted = (
+                    model.objects.annotate(actual=actual)
+                    .exclude(**{field: F("actual")})
+                    .values("pk")
+                )
+                count = drifted.count()
+                if count and not options["dry_run"]:
+                    model.objects.filter(pk__in=drifted).update(
+                        **{field: actual}
+                    )
+            self.stdout.write(
+                f"{model._meta.label}.{field}: {count} drifted rows"
+                + (" (not fixed)" if options["dry_run"] and count else "")
+            )
+        self.stdout.write(self.style.SUCCESS("Counters were recalculated"))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-18 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_recipe_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngredientCatalog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='version')),
+                ('deleted_version', models.PositiveBigIntegerField(default=0, verbose_name='deleted version')),
+            ],
+            options={
+                'verbose_name': 'ingredient catalog',
+                'verbose_name_plural': 'ingredient catalogs',
+            },
+        ),
+        migrations.AddField(
+            model_name='ingredient',
+            name='version',
+            field=models.PositiveBigIntegerField(db_index=True, default=0, editable=False, verbose_name='version'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.1 on 2026-10-18 02:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0005_ingredient_catalog_version'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='ingredient',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='ingredientcatalog',
+            name='source_checksum',
+            field=models.CharField(blank=True, max_length=64, verbose_name='source checksum'),
+        ),
+        migrations.AddConstraint(
+            model_name='ingredient',
+            constraint=models.UniqueConstraint(fields=('name', 'measurement_unit'), name='unique_ingredient'),
+        ),
+    ]
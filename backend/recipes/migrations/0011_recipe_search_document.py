@@ -0,0 +1,70 @@
+# Generated by Django 5.2.1 on 2026-10-18 03:09
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    """
+    UPDATE recipes_recipe AS recipe SET search_document =
+        setweight(to_tsvector('russian', recipe.name), 'A')
+        || setweight(to_tsvector('russian', coalesce((
+            SELECT string_agg(ingredient.name, ' ')
+            FROM recipes_recipeingredient AS item
+            JOIN recipes_ingredient AS ingredient
+                ON ingredient.id = item.ingredient_id
+            WHERE item.recipe_id = recipe.id
+        ), '')), 'B')
+        || setweight(to_tsvector('russian', recipe.text), 'C')
+    """,
+    "CREATE INDEX recipes_recipe_search_gin "
+    "ON recipes_recipe USING gin (search_document)",
+]
+POSTGRES_BACKWARD = ["DROP INDEX recipes_recipe_search_gin"]
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE recipes_recipe_fts USING fts5("
+    "name, ingredients, text, tokenize='unicode61 remove_diacritics 2')",
+    """
+    INSERT INTO recipes_recipe_fts (rowid, name, ingredients, text)
+    SELECT recipe.id, recipe.name, coalesce((
+        SELECT group_concat(ingredient.name, ' ')
+        FROM recipes_recipeingredient AS item
+        JOIN recipes_ingredient AS ingredient
+            ON ingredient.id = item.ingredient_id
+        WHERE item.recipe_id = recipe.id
+    ), ''), recipe.text
+    FROM recipes_recipe AS recipe
+    """,
+]
+SQLITE_BACKWARD = ["DROP TABLE recipes_recipe_fts"]
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_recipe_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_document',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='search document'),
+        ),
+        migrations.RunPython(
+            run_vendor_sql(
+                {'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}
+            ),
+            run_vendor_sql(
+                {'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD}
+            ),
+        ),
+    ]
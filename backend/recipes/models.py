@@ -1,8 +1,15 @@
-import uuid
-
 from django.conf import settings
-from django.db import models
-from django.db.models import UniqueConstraint
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models import (
+    Exists,
+    F,
+    OuterRef,
+    Prefetch,
+    UniqueConstraint,
+    Value,
+)
 from django.utils.translation import gettext_lazy as _
 
 from core.constants import (
@@ -11,6 +18,63 @@ from core.constants import (
     MAX_RECIPE_NAME_LENGTH,
     MAX_SHORT_LINK_LENGTH,
 )
+from favorites.models import Favorite
+from shopping_cart.models import ShoppingCart
+from users.models import Subscription
+
+
+class IngredientCatalog(models.Model):
+    """
+    Версия справочника ингредиентов.
+
+    Версия увеличивается при любом изменении ингредиента; номер версии,
+    на которой ингредиент изменился последний раз, хранится в самом
+    ингредиенте. deleted_version — версия последнего удаления,
+    source_checksum — контрольная сумма последнего загруженного файла.
+    """
+
+    CATALOG_ID = 1
+
+    version = models.PositiveBigIntegerField(_("version"), default=0)
+    deleted_version = models.PositiveBigIntegerField(
+        _("deleted version"), default=0
+    )
+    source_checksum = models.CharField(
+        _("source checksum"), max_length=64, blank=True
+    )
+
+    class Meta:
+        verbose_name = _("ingredient catalog")
+        verbose_name_plural = _("ingredient catalogs")
+
+    @classmethod
+    def get_current(cls):
+        catalog = cls.objects.filter(pk=cls.CATALOG_ID).first()
+        return catalog or cls(pk=cls.CATALOG_ID)
+
+    @classmethod
+    async def aget_current(cls):
+        catalog = await cls.objects.filter(pk=cls.CATALOG_ID).afirst()
+        return catalog or cls(pk=cls.CATALOG_ID)
+
+    @classmethod
+    def get_for_update(cls):
+        """Возвращает справочник, заблокированный до конца транзакции."""
+        catalog, _ = cls.objects.select_for_update().get_or_create(
+            pk=cls.CATALOG_ID
+        )
+        return catalog
+
+    @classmethod
+    @transaction.atomic
+    def bump(cls, deleted=False):
+        """Увеличивает версию справочника и возвращает новое значение."""
+        catalog = cls.get_for_update()
+        catalog.version += 1
+        if deleted:
+            catalog.deleted_version = catalog.version
+        catalog.save(update_fields=["version", "deleted_version"])
+        return catalog.version
 
 
 class Ingredient(models.Model):
@@ -24,6 +88,12 @@ class Ingredient(models.Model):
         _("measurement unit"),
         max_length=MAX_MEASUREMENT_UNIT_NAME_LENGTH,
     )
+    version = models.PositiveBigIntegerField(
+        _("version"),
+        default=0,
+        db_index=True,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = _("ingredient")
@@ -32,14 +102,77 @@ class Ingredient(models.Model):
         indexes = [
             models.Index(fields=["name"]),
         ]
-        UniqueConstraint(
-            name="unique_ingredient", fields=["name", "measurement_unit"]
-        )
+        constraints = [
+            UniqueConstraint(
+                fields=["name", "measurement_unit"],
+                name="unique_ingredient",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name}, {self.measurement_unit}"
 
 
+def get_recipe_prefetches(user):
+    """Подгрузки автора и ингредиентов для сериализации рецептов."""
+    return [
+        Prefetch(
+            "author",
+            queryset=get_user_model().objects.with_is_subscribed(user),
+        ),
+        Prefetch(
+            "recipe_ingredients",
+            queryset=RecipeIngredient.objects.select_related("ingredient"),
+        ),
+    ]
+
+
+class RecipeQuerySet(models.QuerySet):
+    """Набор запросов рецептов."""
+
+    def with_related(self, user):
+        """
+        Подгружает автора и ингредиенты фиксированным числом запросов.
+
+        Флаг подписки на автора вычисляется в запросе подгрузки авторов.
+        """
+        return self.prefetch_related(*get_recipe_prefetches(user))
+
+    def with_author_state(self, user):
+        """
+        Аннотирует рецепты версией автора и флагом подписки на него.
+
+        Вместе с версией рецепта, счётчиками и флагами пользователя этого
+        достаточно для ETag без подгрузки авторов и ингредиентов.
+        """
+        is_subscribed = Value(False)
+        if user.is_authenticated:
+            is_subscribed = Exists(
+                Subscription.objects.filter(
+                    user=user, author=OuterRef("author_id")
+                )
+            )
+        return self.annotate(
+            author_version=F("author__version"),
+            author_is_subscribed=is_subscribed,
+        )
+
+    def with_user_flags(self, user):
+        """Аннотирует рецепты флагами избранного и списка покупок."""
+        if not user.is_authenticated:
+            return self.annotate(
+                is_favorited=Value(False), is_in_shopping_cart=Value(False)
+            )
+        return self.annotate(
+            is_favorited=Exists(
+                Favorite.objects.filter(user=user, recipe=OuterRef("pk"))
+            ),
+            is_in_shopping_cart=Exists(
+                ShoppingCart.objects.filter(user=user, recipe=OuterRef("pk"))
+            ),
+        )
+
+
 class Recipe(models.Model):
     """Модель рецептов."""
 
@@ -57,6 +190,12 @@ class Recipe(models.Model):
         _("image"),
         upload_to="recipes/",
     )
+    image_renditions = models.JSONField(
+        _("image renditions"),
+        default=dict,
+        blank=True,
+        editable=False,
+    )
     text = models.TextField(
         _("description"),
     )
@@ -73,6 +212,7 @@ class Recipe(models.Model):
         _("publication date"),
         auto_now_add=True,
     )
+    # Случайные коды, выданные до перехода на коды, вычисляемые по id.
     short_link = models.CharField(
         _("short link"),
         max_length=MAX_SHORT_LINK_LENGTH,
@@ -80,16 +220,60 @@ class Recipe(models.Model):
         blank=True,
         null=True,
     )
+    version = models.PositiveIntegerField(
+        _("version"),
+        default=0,
+        editable=False,
+    )
+    favorites_count = models.PositiveIntegerField(
+        _("favorites count"),
+        default=0,
+        editable=False,
+    )
+    shopping_cart_count = models.PositiveIntegerField(
+        _("shopping cart count"),
+        default=0,
+        editable=False,
+    )
+    # Разложен ли рецепт по лентам подписчиков при публикации. Остальные
+    # рецепты подмешиваются в ленты при чтении.
+    fanned_out = models.BooleanField(
+        _("fanned out"),
+        default=False,
+        editable=False,
+    )
+    # Поисковый документ PostgreSQL; GIN-индекс по нему и таблица FTS5
+    # для SQLite создаются миграцией 0011 в зависимости от СУБД.
+    search_document = SearchVectorField(
+        _("search document"),
+        null=True,
+        editable=False,
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         verbose_name = _("recipe")
         verbose_name_plural = _("recipes")
-        ordering = ("-pub_date",)
+        ordering = ("-pub_date", "-id")
+        indexes = [
+            models.Index(fields=["-pub_date", "-id"]),
+            models.Index(fields=["author", "-pub_date"]),
+            models.Index(fields=["cooking_time", "-pub_date"]),
+            models.Index(
+                fields=["author", "-pub_date"],
+                condition=models.Q(fanned_out=False),
+                name="recipes_pulled_author_idx",
+            ),
+        ]
 
     def save(self, *args, **kwargs):
-        if not self.short_link:
-            self.short_link = str(uuid.uuid4())[:8]
+        is_update = not self._state.adding
+        if is_update:
+            self.version = models.F("version") + 1
         super().save(*args, **kwargs)
+        if is_update:
+            self.refresh_from_db(fields=["version"])
 
     def __str__(self):
         return self.name
@@ -125,8 +309,54 @@ class RecipeIngredient(models.Model):
         ]
         indexes = [
             models.Index(fields=["recipe"]),
-            models.Index(fields=["ingredient"]),
+            # Покрывающий индекс для фильтров рецептов по ингредиентам.
+            models.Index(fields=["ingredient", "recipe"]),
         ]
 
     def __str__(self):
         return f"{self.recipe.name}: {self.ingredient.name} - {self.amount}"
+
+
+class FeedEntry(models.Model):
+    """
+    Запись ленты подписок: рецепт автора, на которого подписан user.
+
+    Записи создаются при публикации рецепта (fan-out on write) для
+    авторов с небольшим числом подписчиков. Рецепты без флага
+    fanned_out подмешиваются при чтении ленты.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="feed_entries",
+        verbose_name=_("user"),
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="feed_entries",
+        verbose_name=_("recipe"),
+    )
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name=_("author"),
+    )
+
+    class Meta:
+        verbose_name = _("feed entry")
+        verbose_name_plural = _("feed entries")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "recipe"],
+                name="unique_feed_entry",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["user", "author"]),
+        ]
+
+    def __str__(self):
+        return f"{self.recipe} в ленте {self.user}"
@@ -0,0 +1,22 @@
+from django.conf import settings
+
+from core.caches import load_cache_backend
+
+# Бэкенды остаются доступны по прежнему пути для RECIPE_CACHE_BACKEND.
+from core.caches import DjangoCacheBackend, LocMemLRUBackend  # noqa: F401
+
+
+def make_recipe_cache_key(recipe, catalog_version, base_url):
+    """
+    Ключ записи рецепта.
+
+    Версия рецепта растёт при его сохранении и изменении ингредиентов,
+    версия справочника — при изменении самих ингредиентов. Базовый URL
+    нужен, потому что ссылки на изображения абсолютные.
+    """
+    return (
+        f"recipe:{recipe.pk}:{recipe.version}:{catalog_version}:{base_url}"
+    )
+
+
+recipe_cache = load_cache_backend(settings.RECIPE_CACHE)
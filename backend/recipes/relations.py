@@ -0,0 +1,97 @@
+from django.db import connections, router, transaction
+
+from core.counters import change_counters
+from core.toggles import bulk_insert_ignore
+from .models import Recipe
+
+ADDED = "added"
+ALREADY_ADDED = "already_added"
+REMOVED = "removed"
+NOT_ADDED = "not_added"
+NOT_FOUND = "not_found"
+
+
+def get_existing_recipe_ids(recipe_ids):
+    return set(
+        Recipe.objects.filter(pk__in=recipe_ids)
+        .order_by()
+        .values_list("pk", flat=True)
+    )
+
+
+def add_recipes(model, counter, user, recipe_ids):
+    """
+    Добавляет рецепты в избранное или список покупок пользователя.
+
+    model — Favorite или ShoppingCart, counter — его счётчик у рецепта.
+    Связи пишутся одним INSERT ... ON CONFLICT DO NOTHING RETURNING без
+    сигналов, и счётчик растёт одним UPDATE только у рецептов, которые
+    вставил этот запрос. Возвращает статус для каждого id.
+    """
+    found = get_existing_recipe_ids(recipe_ids)
+    with transaction.atomic():
+        added = set(
+            bulk_insert_ignore(
+                [
+                    model(user=user, recipe_id=pk)
+                    for pk in dict.fromkeys(recipe_ids)
+                    if pk in found
+                ],
+                returning="recipe",
+            )
+        )
+        change_counters(Recipe, added, counter, 1)
+    return {
+        pk: (
+            NOT_FOUND
+            if pk not in found
+            else ADDED if pk in added else ALREADY_ADDED
+        )
+        for pk in recipe_ids
+    }
+
+
+def delete_user_recipes(model, user, recipe_ids):
+    """
+    Удаляет связи одним DELETE ... RETURNING без сигналов.
+
+    Возвращает id рецептов, строки которых удалил этот запрос.
+    """
+    if not recipe_ids:
+        return set()
+    connection = connections[router.db_for_write(model)]
+    quote_name = connection.ops.quote_name
+    user_column = quote_name(model._meta.get_field("user").column)
+    recipe_column = quote_name(model._meta.get_field("recipe").column)
+    placeholders = ", ".join(["%s"] * len(recipe_ids))
+    sql = (
+        f"DELETE FROM {quote_name(model._meta.db_table)} "
+        f"WHERE {user_column} = %s AND {recipe_column} IN ({placeholders}) "
+        f"RETURNING {recipe_column}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [user.pk, *recipe_ids])
+        return {recipe_id for recipe_id, in cursor.fetchall()}
+
+
+def remove_recipes(model, counter, user, recipe_ids):
+    """
+    Убирает рецепты из избранного или списка покупок пользователя.
+
+    Строки удаляются одним DELETE без сигналов post_delete: с ними
+    каждый обработчик делал бы свой UPDATE счётчика. Счётчик
+    уменьшается одним UPDATE только у рецептов, строки которых удалил
+    этот запрос. Возвращает статус для каждого id.
+    """
+    found = get_existing_recipe_ids(recipe_ids)
+    with transaction.atomic():
+        removed = delete_user_recipes(model, user, found)
+        change_counters(Recipe, removed, counter, -1)
+    return {
+        pk: (
+            NOT_FOUND
+            if pk not in found
+            else REMOVED if pk in removed else NOT_ADDED
+        )
+        for pk in recipe_ids
+    }
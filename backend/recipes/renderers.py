@@ -0,0 +1,40 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+class ShoppingListRenderer(BaseRenderer):
+    """
+    Рендерер форматов списка покупок.
+
+    Сам список отдаётся потоком из вьюсета, а через рендерер проходят
+    только ответы с ошибками, которые остаются в JSON.
+    """
+
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return JSONRenderer().render(data)
+
+
+class PlainTextRenderer(ShoppingListRenderer):
+    media_type = "text/plain"
+    format = "txt"
+
+
+class CSVRenderer(ShoppingListRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+
+class PDFRenderer(ShoppingListRenderer):
+    media_type = "application/pdf"
+    format = "pdf"
+    charset = None
+
+
+# Форматы скачивания списка покупок; JSON — первым, для ответов с ошибками.
+SHOPPING_LIST_RENDERER_CLASSES = [
+    JSONRenderer,
+    PlainTextRenderer,
+    CSVRenderer,
+    PDFRenderer,
+]
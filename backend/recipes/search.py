@@ -0,0 +1,145 @@
+import re
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+)
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.models import F, FloatField, OuterRef, Subquery, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+
+from .models import Ingredient, Recipe, RecipeIngredient
+
+SEARCH_CONFIG = "russian"
+SEARCH_RANK = "search_rank"
+FTS_TABLE = "recipes_recipe_fts"
+# Веса колонок FTS5 (название, ингредиенты, описание) соответствуют
+# весам A, B и C документа PostgreSQL.
+FTS_WEIGHTS = (10.0, 4.0, 1.0)
+
+
+def order_by_rank(queryset):
+    return queryset.order_by(f"-{SEARCH_RANK}", "-pub_date", "-id")
+
+
+class PostgresSearchBackend:
+    """
+    Поиск по столбцу search_document с GIN-индексом.
+
+    Документ собирается из названия, названий ингредиентов и описания с
+    весами A, B и C и русской морфологией. Запрос пользователя
+    разбирается как в поисковиках (websearch_to_tsquery).
+    """
+
+    def search(self, queryset, text):
+        query = SearchQuery(
+            text, config=SEARCH_CONFIG, search_type="websearch"
+        )
+        return order_by_rank(
+            queryset.filter(search_document=query).annotate(
+                **{SEARCH_RANK: SearchRank(F("search_document"), query)}
+            )
+        )
+
+    def update(self, queryset):
+        ingredient_names = Subquery(
+            RecipeIngredient.objects.filter(recipe=OuterRef("pk"))
+            .order_by()
+            .values("recipe")
+            .annotate(names=StringAgg("ingredient__name", " "))
+            .values("names")
+        )
+        queryset.update(
+            search_document=(
+                SearchVector("name", weight="A", config=SEARCH_CONFIG)
+                + SearchVector(
+                    Coalesce(ingredient_names, Value("")),
+                    weight="B",
+                    config=SEARCH_CONFIG,
+                )
+                + SearchVector("text", weight="C", config=SEARCH_CONFIG)
+            )
+        )
+
+    def delete(self, recipe_ids):
+        """Документ хранится в строке рецепта и удаляется вместе с ней."""
+
+
+class SQLiteSearchBackend:
+    """
+    Поиск по таблице FTS5 для разработки и тестов.
+
+    Морфологии нет, поэтому каждое слово запроса ищется как префикс.
+    Порядок по bm25 с весами колонок, как у документа PostgreSQL.
+    """
+
+    def get_match(self, text):
+        terms = re.findall(r"\w+", text.lower())
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def search(self, queryset, text):
+        match = self.get_match(text)
+        if not match:
+            return queryset.none()
+        weights = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+        rank = RawSQL(
+            f"SELECT -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s "
+            f"AND rowid = {Recipe._meta.db_table}.id",
+            [match],
+            output_field=FloatField(),
+        )
+        matches = RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+            [match],
+        )
+        return order_by_rank(
+            queryset.filter(pk__in=matches).annotate(**{SEARCH_RANK: rank})
+        )
+
+    def update(self, queryset):
+        sql, params = queryset.order_by().values("pk").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({sql})", params
+            )
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, name, ingredients, text) "
+                "SELECT recipe.id, recipe.name, coalesce(("
+                "SELECT group_concat(ingredient.name, ' ') "
+                f"FROM {RecipeIngredient._meta.db_table} AS item "
+                f"JOIN {Ingredient._meta.db_table} AS ingredient "
+                "ON ingredient.id = item.ingredient_id "
+                "WHERE item.recipe_id = recipe.id"
+                "), ''), recipe.text "
+                f"FROM {Recipe._meta.db_table} AS recipe "
+                f"WHERE recipe.id IN ({sql})",
+                params,
+            )
+
+    def delete(self, recipe_ids):
+        placeholders = ", ".join(["%s"] * len(recipe_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})",
+                list(recipe_ids),
+            )
+
+
+SEARCH_BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+
+def get_search_backend():
+    try:
+        return SEARCH_BACKENDS[connection.vendor]()
+    except KeyError:
+        raise ImproperlyConfigured(
+            f"Recipe search is not supported on {connection.vendor}"
+        )
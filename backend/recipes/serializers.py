@@ -1,10 +1,17 @@
 from django.db import transaction
 from rest_framework import serializers
 
-from core.fields import Base64ImageField
-from core.constants import MIN_AMOUNT_OF_INGREDIENT, MIN_COOKING_TIME
+from core.fields import Base64ImageField, ImageRenditionsField
+from core.constants import (
+    MAX_BATCH_RECIPES,
+    MIN_AMOUNT_OF_INGREDIENT,
+    MIN_COOKING_TIME,
+)
+from core.renderers import JSONFragment
 from users.serializers import CustomUserSerializer
-from .models import Ingredient, Recipe, RecipeIngredient
+from .models import Ingredient, IngredientCatalog, Recipe, RecipeIngredient
+from .recipe_cache import make_recipe_cache_key, recipe_cache
+from .short_links import get_recipe_short_link
 
 
 class IngredientSerializer(serializers.ModelSerializer):
@@ -30,7 +37,22 @@ class IngredientInRecipeSerializer(serializers.ModelSerializer):
 
 
 class RecipeListSerializer(serializers.ModelSerializer):
-    """Сериализатор для получения списка рецептов."""
+    """
+    Сериализатор для получения списка рецептов.
+
+    Не зависящая от пользователя часть рецепта берётся из recipe_cache,
+    список ингредиентов хранится в нём уже закодированным в JSON.
+    Автор, флаги пользователя и счётчики вычисляются на каждый запрос:
+    они меняются без изменения версии рецепта.
+    """
+
+    per_request_fields = (
+        "author",
+        "is_favorited",
+        "is_in_shopping_cart",
+        "favorites_count",
+        "shopping_cart_count",
+    )
 
     author = CustomUserSerializer(read_only=True)
     ingredients = IngredientInRecipeSerializer(
@@ -38,6 +60,7 @@ class RecipeListSerializer(serializers.ModelSerializer):
     )
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
+    image_renditions = ImageRenditionsField("image")
 
     class Meta:
         model = Recipe
@@ -49,17 +72,61 @@ class RecipeListSerializer(serializers.ModelSerializer):
             "is_in_shopping_cart",
             "name",
             "image",
+            "image_renditions",
             "text",
             "cooking_time",
+            "favorites_count",
+            "shopping_cart_count",
+        )
+        read_only_fields = ("favorites_count", "shopping_cart_count")
+
+    def get_cache_key(self, instance):
+        if "ingredient_catalog_version" not in self.context:
+            self.context["ingredient_catalog_version"] = (
+                IngredientCatalog.get_current().version
+            )
+        request = self.context.get("request")
+        base_url = request.build_absolute_uri("/") if request else ""
+        return make_recipe_cache_key(
+            instance, self.context["ingredient_catalog_version"], base_url
         )
 
+    def to_representation(self, instance):
+        key = self.get_cache_key(instance)
+        cached = recipe_cache.get(key)
+        if cached is None:
+            data = super().to_representation(instance)
+            cached = {
+                name: value
+                for name, value in data.items()
+                if name not in self.per_request_fields
+            }
+            cached["ingredients"] = JSONFragment.encode(data["ingredients"])
+            recipe_cache.set(key, cached)
+            return data
+
+        overlay = {}
+        for name in self.per_request_fields:
+            field = self.fields[name]
+            overlay[name] = field.to_representation(
+                field.get_attribute(instance)
+            )
+        return {
+            name: overlay[name] if name in overlay else cached[name]
+            for name in self.Meta.fields
+        }
+
     def get_is_favorited(self, obj):
+        if hasattr(obj, "is_favorited"):
+            return obj.is_favorited
         user = self.context.get("request").user
         if user.is_anonymous:
             return False
         return user.favorites.filter(recipe=obj).exists()
 
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, "is_in_shopping_cart"):
+            return obj.is_in_shopping_cart
         user = self.context.get("request").user
         if user.is_anonymous:
             return False
@@ -101,7 +168,7 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
         )
 
     def validate(self, data):
-        if "ingredients" not in self.initial_data:
+        if not self.partial and "ingredients" not in self.initial_data:
             raise serializers.ValidationError(
                 {"ingredients": "Поле ингредиентов обязательно"}
             )
@@ -126,18 +193,53 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
             )
         return value
 
+    def build_ingredient(self, recipe, ingredient):
+        return RecipeIngredient(
+            recipe=recipe,
+            ingredient_id=ingredient["id"].id,
+            amount=ingredient["amount"],
+        )
+
     def create_ingredients(self, recipe, ingredients):
         RecipeIngredient.objects.bulk_create(
             [
-                RecipeIngredient(
-                    recipe=recipe,
-                    ingredient_id=ingredient["id"].id,
-                    amount=ingredient["amount"],
-                )
+                self.build_ingredient(recipe, ingredient)
                 for ingredient in ingredients
             ]
         )
 
+    def update_ingredients(self, recipe, ingredients):
+        """
+        Приводит ингредиенты рецепта к списку ingredients.
+
+        Пишутся только отличия: новые строки создаются, у оставшихся
+        обновляется изменившееся количество, лишние удаляются по id.
+        """
+        current = {
+            item.ingredient_id: item
+            for item in recipe.recipe_ingredients.only(
+                "id", "recipe_id", "ingredient_id", "amount"
+            )
+        }
+        created = []
+        changed = []
+        for ingredient in ingredients:
+            item = current.pop(ingredient["id"].id, None)
+            if item is None:
+                created.append(self.build_ingredient(recipe, ingredient))
+            elif item.amount != ingredient["amount"]:
+                item.amount = ingredient["amount"]
+                changed.append(item)
+
+        if current:
+            RecipeIngredient.objects.filter(
+                pk__in=[item.pk for item in current.values()]
+            ).delete()
+        if changed:
+            RecipeIngredient.objects.bulk_update(changed, ["amount"])
+        if created:
+            RecipeIngredient.objects.bulk_create(created)
+
     @transaction.atomic
     def create(self, validated_data):
         ingredients = validated_data.pop("ingredients")
@@ -150,10 +252,8 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
     @transaction.atomic
     def update(self, instance, validated_data):
         ingredients = validated_data.pop("ingredients", None)
-
-        instance.recipe_ingredients.all().delete()
-        self.create_ingredients(instance, ingredients)
-
+        if ingredients is not None:
+            self.update_ingredients(instance, ingredients)
         return super().update(instance, validated_data)
 
     def to_representation(self, instance):
@@ -175,9 +275,22 @@ class RecipeGetShortLinkSerializer(serializers.ModelSerializer):
 
     def get_short_link(self, obj):
         request = self.context.get("request")
-        return request.build_absolute_uri(f"/s/{obj.short_link}")
+        return request.build_absolute_uri(f"/s/{get_recipe_short_link(obj)}")
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
         data["short-link"] = data.pop("short_link")
         return data
+
+
+class RecipeBatchSerializer(serializers.Serializer):
+    """Сериализатор списка id рецептов для пакетных действий."""
+
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_BATCH_RECIPES,
+    )
+
+    def validate_recipes(self, value):
+        return list(dict.fromkeys(value))
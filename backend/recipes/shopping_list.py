@@ -0,0 +1,223 @@
+import asyncio
+import csv
+import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.models import Sum
+from django.http import StreamingHttpResponse
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .models import RecipeIngredient
+
+SHOPPING_LIST_TITLE = "Список покупок:"
+CSV_HEADER = ("Ингредиент", "Единица измерения", "Количество")
+ROWS_CHUNK_SIZE = 500
+
+PDF_FONT_NAME = "ShoppingListFont"
+PDF_FONT_SIZE = 12
+PDF_LINE_HEIGHT = 7 * mm
+PDF_MARGIN = 20 * mm
+PDF_SPOOL_SIZE = 1024 * 1024
+PDF_CHUNK_SIZE = 64 * 1024
+
+pdf_executor = ThreadPoolExecutor(
+    max_workers=settings.SHOPPING_LIST_PDF_WORKERS,
+    thread_name_prefix="shopping-list-pdf",
+)
+
+
+class PDFBuildTimeout(APIException):
+    """PDF не построен за SHOPPING_LIST_PDF_TIMEOUT секунд."""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Список покупок сейчас не удалось построить"
+    default_code = "pdf_timeout"
+
+    def __init__(self):
+        super().__init__()
+        # Обработчик исключений DRF передаёт wait в заголовке Retry-After.
+        self.wait = settings.SHOPPING_LIST_PDF_TIMEOUT
+
+
+def get_shopping_list_rows(user):
+    """Итерирует по ингредиентам списка покупок, суммированным в БД."""
+    return (
+        RecipeIngredient.objects.filter(recipe__shopping_cart__user=user)
+        .values("ingredient__name", "ingredient__measurement_unit")
+        .annotate(total_amount=Sum("amount"))
+        .order_by("ingredient__name")
+        .iterator(chunk_size=ROWS_CHUNK_SIZE)
+    )
+
+
+def format_row(row):
+    return (
+        f"{row['ingredient__name']} "
+        f"({row['ingredient__measurement_unit']}) — "
+        f"{row['total_amount']}"
+    )
+
+
+def iter_txt(rows):
+    yield f"{SHOPPING_LIST_TITLE}\n\n"
+    for row in rows:
+        yield f"{format_row(row)}\n"
+
+
+class Echo:
+    """Псевдобуфер, возвращающий записанное вместо его хранения."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+    for row in rows:
+        yield writer.writerow(
+            (
+                row["ingredient__name"],
+                row["ingredient__measurement_unit"],
+                row["total_amount"],
+            )
+        )
+
+
+def iter_json(rows):
+    yield "["
+    separator = ""
+    for row in rows:
+        item = {
+            "name": row["ingredient__name"],
+            "measurement_unit": row["ingredient__measurement_unit"],
+            "amount": row["total_amount"],
+        }
+        yield separator + json.dumps(item, ensure_ascii=False)
+        separator = ","
+    yield "]"
+
+
+def register_pdf_font():
+    if PDF_FONT_NAME not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(
+            TTFont(PDF_FONT_NAME, settings.SHOPPING_LIST_PDF_FONT)
+        )
+
+
+def build_pdf(user):
+    """
+    Строит PDF списка покупок во временном файле.
+
+    Выполняется в пуле pdf_executor, поэтому закрывает соединения с БД
+    своего потока по завершении.
+    """
+    try:
+        register_pdf_font()
+        output = tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_SIZE)
+        pdf = canvas.Canvas(output, pagesize=A4)
+        _, height = A4
+        top = height - PDF_MARGIN
+
+        pdf.setFont(PDF_FONT_NAME, PDF_FONT_SIZE)
+        pdf.drawString(PDF_MARGIN, top, SHOPPING_LIST_TITLE)
+        y = top - 2 * PDF_LINE_HEIGHT
+        for row in get_shopping_list_rows(user):
+            if y < PDF_MARGIN:
+                pdf.showPage()
+                pdf.setFont(PDF_FONT_NAME, PDF_FONT_SIZE)
+                y = top
+            pdf.drawString(PDF_MARGIN, y, format_row(row))
+            y -= PDF_LINE_HEIGHT
+        pdf.save()
+
+        output.seek(0)
+        return output
+    finally:
+        connections.close_all()
+
+
+def get_pdf(user):
+    """
+    Строит PDF в пуле pdf_executor и ждёт его не дольше таймаута.
+
+    Пул ограничивает число PDF, которые строятся одновременно. Если PDF
+    не готов вовремя, задача снимается из очереди (начатая достраивается
+    в фоне), а клиент получает 503 с Retry-After.
+    """
+    future = pdf_executor.submit(build_pdf, user)
+    try:
+        return future.result(timeout=settings.SHOPPING_LIST_PDF_TIMEOUT)
+    except TimeoutError:
+        future.cancel()
+        raise PDFBuildTimeout()
+
+
+async def aget_pdf(user):
+    """Асинхронный вариант get_pdf: ожидание не занимает поток."""
+    future = pdf_executor.submit(build_pdf, user)
+    try:
+        return await asyncio.wait_for(
+            asyncio.wrap_future(future), settings.SHOPPING_LIST_PDF_TIMEOUT
+        )
+    except TimeoutError:
+        future.cancel()
+        raise PDFBuildTimeout()
+
+
+def iter_file(file):
+    return iter(lambda: file.read(PDF_CHUNK_SIZE), b"")
+
+
+def take(iterator, size):
+    return list(islice(iterator, size))
+
+
+async def aiter_stream(parts, batch_size):
+    """
+    Отдаёт синхронный поток асинхронно, склеивая по batch_size частей.
+
+    Пачки собираются через sync_to_async, поэтому запросы к БД и чтение
+    файла не блокируют event loop, а в памяти одна пачка. Синхронный
+    поток StreamingHttpResponse под ASGI Django читает в память целиком.
+    """
+    parts = iter(parts)
+    while batch := await sync_to_async(take)(parts, batch_size):
+        # Части — строки или байты: пустой срез даёт разделитель их типа.
+        yield batch[0][:0].join(batch)
+
+
+def make_attachment(content, file_format):
+    """Ответ, который отдаёт content потоком как файл списка покупок."""
+    response = StreamingHttpResponse(
+        content, content_type=SHOPPING_LIST_CONTENT_TYPES[file_format]
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="shopping_list.{file_format}"'
+    )
+    return response
+
+
+SHOPPING_LIST_STREAMS = {
+    "txt": iter_txt,
+    "csv": iter_csv,
+    "json": iter_json,
+}
+
+SHOPPING_LIST_CONTENT_TYPES = {
+    "txt": "text/plain; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+    "json": "application/json",
+    "pdf": "application/pdf",
+}
@@ -0,0 +1,101 @@
+import string
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from core.caches import load_cache_backend
+from core.constants import SHORT_LINK_LENGTH
+from .models import Recipe
+
+ALPHABET = string.digits + string.ascii_letters
+BASE = len(ALPHABET)
+CODE_SPACE = BASE**SHORT_LINK_LENGTH
+
+# Аффинная биекция на [0, CODE_SPACE): соседние id дают непохожие коды.
+# Константы нельзя менять, иначе перестанут открываться выданные ссылки.
+MULTIPLIER = 3835823779
+MULTIPLIER_INVERSE = pow(MULTIPLIER, -1, CODE_SPACE)
+OFFSET = 24190616839
+
+short_link_cache = load_cache_backend(settings.SHORT_LINK_CACHE)
+
+
+def encode_recipe_id(recipe_id):
+    """Возвращает короткий код рецепта фиксированной длины."""
+    if not 0 < recipe_id < CODE_SPACE:
+        raise ValueError(f"Recipe id {recipe_id} is out of short link range")
+    value = (recipe_id * MULTIPLIER + OFFSET) % CODE_SPACE
+    chars = []
+    for _ in range(SHORT_LINK_LENGTH):
+        value, remainder = divmod(value, BASE)
+        chars.append(ALPHABET[remainder])
+    return "".join(reversed(chars))
+
+
+def decode_short_link(code):
+    """
+    Восстанавливает id по коду или возвращает None.
+
+    Любой код допустимой длины из символов алфавита даёт какой-то id,
+    поэтому существование рецепта проверяет find_recipe_id.
+    """
+    if len(code) != SHORT_LINK_LENGTH:
+        return None
+    value = 0
+    for char in code:
+        index = ALPHABET.find(char)
+        if index < 0:
+            return None
+        value = value * BASE + index
+    recipe_id = (value - OFFSET) * MULTIPLIER_INVERSE % CODE_SPACE
+    return recipe_id or None
+
+
+def find_recipe_id(code):
+    """Ищет в БД рецепт по вычисляемому или старому сохранённому коду."""
+    recipe_id = decode_short_link(code)
+    recipes = (
+        Recipe.objects.filter(short_link=code)
+        if recipe_id is None
+        else Recipe.objects.filter(pk=recipe_id)
+    )
+    return recipes.values_list("id", flat=True).first()
+
+
+def forget_short_links(codes):
+    """Убирает коды удалённого рецепта из кэша процесса."""
+    for code in codes:
+        short_link_cache.delete(code)
+
+
+def get_recipe_short_link(recipe):
+    """Короткий код рецепта: старый сохранённый или вычисляемый по id."""
+    return recipe.short_link or encode_recipe_id(recipe.pk)
+
+
+def resolve_short_link(code):
+    """
+    Возвращает id существующего рецепта по короткому коду или None.
+
+    Найденные id хранятся в short_link_cache: LRU с ограниченным числом
+    записей и временем жизни SHORT_LINK_CACHE_TIMEOUT, так что ссылка
+    удалённого рецепта в других процессах перестаёт работать не позже
+    чем через это время. Неизвестные коды не кэшируются, чтобы перебор
+    кодов не вытеснял настоящие ссылки.
+    """
+    recipe_id = short_link_cache.get(code)
+    if recipe_id is None:
+        recipe_id = find_recipe_id(code)
+        if recipe_id is not None:
+            short_link_cache.set(code, recipe_id)
+    return recipe_id
+
+
+async def aresolve_short_link(code):
+    """Асинхронный вариант resolve_short_link."""
+    recipe_id = short_link_cache.get(code)
+    if recipe_id is None:
+        recipe_id = await sync_to_async(find_recipe_id)(code)
+        if recipe_id is not None:
+            short_link_cache.set(code, recipe_id)
+    return recipe_id
@@ -0,0 +1,131 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.counters import change_counter
+from core.images import schedule_renditions
+from users.models import Subscription
+from .feed import backfill_feeds, fan_out_recipe, prune_feed
+from .ingredient_index import ingredient_index
+from .models import Ingredient, IngredientCatalog, Recipe, RecipeIngredient
+from .search import get_search_backend
+from .short_links import encode_recipe_id, forget_short_links
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_ingredient_index(sender, **kwargs):
+    """Сбрасывает индекс ингредиентов при их изменении."""
+    transaction.on_commit(ingredient_index.invalidate)
+
+
+@receiver(pre_save, sender=Ingredient)
+def bump_catalog_version_on_save(sender, instance, **kwargs):
+    """Присваивает изменённому ингредиенту новую версию справочника."""
+    instance.version = IngredientCatalog.bump()
+
+
+@receiver(post_delete, sender=Ingredient)
+def bump_catalog_version_on_delete(sender, **kwargs):
+    """Фиксирует удаление ингредиента в версии справочника."""
+    IngredientCatalog.bump(deleted=True)
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def bump_recipe_version(sender, instance, **kwargs):
+    """Меняет версию рецепта при изменении его ингредиентов."""
+    Recipe.objects.filter(pk=instance.recipe_id).update(
+        version=F("version") + 1
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def increment_recipes_count(sender, instance, created, **kwargs):
+    """Увеличивает счётчик рецептов автора."""
+    if created:
+        change_counter(User, instance.author_id, "recipes_count", 1)
+
+
+@receiver(post_delete, sender=Recipe)
+def decrement_recipes_count(sender, instance, **kwargs):
+    """Уменьшает счётчик рецептов автора."""
+    change_counter(User, instance.author_id, "recipes_count", -1)
+
+
+@receiver(post_save, sender=Recipe)
+def build_recipe_image_renditions(sender, instance, update_fields, **kwargs):
+    """Ставит в очередь построение миниатюр изображения рецепта."""
+    if update_fields is None or "image" in update_fields:
+        transaction.on_commit(
+            lambda: schedule_renditions(
+                instance, "image", {"version": F("version") + 1}
+            )
+        )
+
+
+def schedule_search_update(queryset):
+    transaction.on_commit(lambda: get_search_backend().update(queryset))
+
+
+@receiver(post_save, sender=Recipe)
+def update_recipe_search_document(sender, instance, update_fields, **kwargs):
+    """
+    Обновляет поисковый документ рецепта после фиксации транзакции.
+
+    К этому моменту ингредиенты нового рецепта уже записаны.
+    """
+    if update_fields is None or {"name", "text"} & set(update_fields):
+        schedule_search_update(Recipe.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def update_search_document_on_ingredients(sender, instance, **kwargs):
+    """Обновляет поисковый документ при изменении состава рецепта."""
+    schedule_search_update(Recipe.objects.filter(pk=instance.recipe_id))
+
+
+@receiver(post_save, sender=Ingredient)
+def update_search_documents_on_rename(sender, instance, created, **kwargs):
+    """Обновляет документы рецептов с переименованным ингредиентом."""
+    if not created:
+        schedule_search_update(
+            Recipe.objects.filter(recipe_ingredients__ingredient=instance)
+        )
+
+
+@receiver(post_delete, sender=Recipe)
+def delete_recipe_search_document(sender, instance, **kwargs):
+    get_search_backend().delete([instance.pk])
+
+
+@receiver(post_delete, sender=Recipe)
+def forget_deleted_recipe_short_links(sender, instance, **kwargs):
+    """Убирает короткие ссылки удалённого рецепта из кэша."""
+    codes = [encode_recipe_id(instance.pk), instance.short_link]
+    transaction.on_commit(lambda: forget_short_links(filter(None, codes)))
+
+
+@receiver(post_save, sender=Recipe)
+def fan_out_new_recipe(sender, instance, created, **kwargs):
+    """Раскладывает новый рецепт по лентам подписчиков автора."""
+    if created:
+        transaction.on_commit(lambda: fan_out_recipe(instance))
+
+
+@receiver(post_save, sender=Subscription)
+def backfill_subscriber_feed(sender, instance, created, **kwargs):
+    """Добавляет в ленту последние рецепты нового автора из подписок."""
+    if created:
+        backfill_feeds([(instance.user_id, instance.author_id)])
+
+
+@receiver(post_delete, sender=Subscription)
+def prune_subscriber_feed(sender, instance, **kwargs):
+    """Убирает из ленты рецепты автора после отписки."""
+    prune_feed(instance.user_id, instance.author_id)
@@ -1,49 +1,183 @@
-from django.db.models import Sum
-from django.http import HttpResponse
+from django.db.models import prefetch_related_objects
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
-from core.pagination import CustomPagination
+from core.conditional import etag_matches, not_modified, set_etag
+from core.pagination import FeedPagination
 from core.permissions import IsOwnerOrReadOnly
+from core.toggles import delete_filtered
 from favorites.models import Favorite
 from favorites.serializers import FavoriteSerializer
 from shopping_cart.models import ShoppingCart
 from shopping_cart.serializers import ShoppingCartSerializer
+from .catalog import get_catalog_content
+from .feed import filter_feed
 from .filters import RecipeFilter, IngredientFilter
-from .models import Ingredient, Recipe, RecipeIngredient
+from .etags import get_page_envelope, make_recipes_etag
+from .models import (
+    Ingredient,
+    IngredientCatalog,
+    Recipe,
+    get_recipe_prefetches,
+)
+from .relations import add_recipes, remove_recipes
+from .renderers import SHOPPING_LIST_RENDERER_CLASSES, PlainTextRenderer
 from .serializers import (
     IngredientSerializer,
+    RecipeBatchSerializer,
     RecipeCreateUpdateSerializer,
     RecipeGetShortLinkSerializer,
     RecipeListSerializer,
 )
+from .shopping_list import (
+    SHOPPING_LIST_CONTENT_TYPES,
+    SHOPPING_LIST_STREAMS,
+    get_pdf,
+    get_shopping_list_rows,
+    make_attachment,
+)
 
 
 class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
-    """Вьюсет для ингредиентов."""
+    """
+    Вьюсет для ингредиентов.
+
+    Полный список отдаётся заранее отрендеренным со строгим ETag по
+    версии справочника. Параметр since возвращает только ингредиенты,
+    изменённые после указанной версии.
+    """
 
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = [permissions.AllowAny]
     filter_backends = [IngredientFilter]
 
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get(IngredientFilter.search_param):
+            return super().list(request, *args, **kwargs)
+
+        catalog = IngredientCatalog.get_current()
+        if "since" in request.query_params:
+            return self.list_changes(request, catalog)
+
+        etag = f'"{catalog.version}"'
+        if_none_match = request.headers.get("If-None-Match", "")
+        if etag in parse_etags(if_none_match) or if_none_match == "*":
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(
+                get_catalog_content(catalog.version),
+                content_type="application/json",
+            )
+        response["ETag"] = etag
+        return response
+
+    def list_changes(self, request, catalog):
+        try:
+            since = int(request.query_params["since"])
+        except ValueError:
+            raise ValidationError(
+                {"since": "Версия должна быть целым числом."}
+            )
+
+        full = since < catalog.deleted_version
+        queryset = Ingredient.objects.all()
+        if not full:
+            queryset = queryset.filter(version__gt=since)
+        return Response(
+            {
+                "version": catalog.version,
+                "full": full,
+                "ingredients": self.get_serializer(queryset, many=True).data,
+            }
+        )
+
 
 class RecipeViewSet(viewsets.ModelViewSet):
-    """Вьюсет для рецептов."""
+    """
+    Вьюсет для рецептов.
+
+    Рецепт, список и ленту можно запрашивать условно: ETag вычисляется
+    по версиям, счётчикам и флагам пользователя до подгрузки авторов и
+    ингредиентов, и при совпадении с If-None-Match сериализатор не
+    запускается.
+    """
 
     queryset = Recipe.objects.all()
     permission_classes = [IsOwnerOrReadOnly]
-    pagination_class = CustomPagination
+    pagination_class = FeedPagination
     filter_backends = [DjangoFilterBackend]
     filterset_class = RecipeFilter
+    catalog_version = None
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ["list", "retrieve", "feed"]:
+            user = self.request.user
+            return queryset.with_user_flags(user).with_author_state(user)
+        return queryset
 
     def get_serializer_class(self):
         if self.action in ["create", "update", "partial_update"]:
             return RecipeCreateUpdateSerializer
         return RecipeListSerializer
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.catalog_version is not None:
+            context["ingredient_catalog_version"] = self.catalog_version
+        return context
+
+    def list(self, request, *args, **kwargs):
+        return self.list_recipes(self.filter_queryset(self.get_queryset()))
+
+    def list_recipes(self, queryset):
+        page = self.paginate_queryset(queryset)
+        self.catalog_version = IngredientCatalog.get_current().version
+        etag = make_recipes_etag(
+            self.request,
+            page,
+            self.catalog_version,
+            get_page_envelope(self.paginator),
+        )
+        if etag_matches(self.request, etag):
+            return not_modified(etag)
+        prefetch_related_objects(
+            page, *get_recipe_prefetches(self.request.user)
+        )
+        serializer = self.get_serializer(page, many=True)
+        return set_etag(self.get_paginated_response(serializer.data), etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        recipe = self.get_object()
+        self.catalog_version = IngredientCatalog.get_current().version
+        etag = make_recipes_etag(request, [recipe], self.catalog_version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        prefetch_related_objects(
+            [recipe], *get_recipe_prefetches(request.user)
+        )
+        serializer = self.get_serializer(recipe)
+        return set_etag(Response(serializer.data), etag)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def feed(self, request):
+        """Рецепты авторов из подписок пользователя, новые сначала."""
+        return self.list_recipes(
+            self.filter_queryset(
+                filter_feed(self.get_queryset(), request.user)
+            )
+        )
+
     @action(
         detail=True,
         methods=["get"],
@@ -67,19 +201,15 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
         if request.method == "POST":
             serializer = FavoriteSerializer(
-                data={"user": request.user.id, "recipe": recipe.id},
-                context={"request": request},
+                data={}, context={"request": request}
             )
             serializer.is_valid(raise_exception=True)
-            serializer.save()
+            serializer.save(user=request.user, recipe=recipe)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-        try:
-            favorite = Favorite.objects.get(user=request.user, recipe=recipe)
-            favorite.delete()
-            return Response(status=status.HTTP_204_NO_CONTENT)
-        except Favorite.DoesNotExist:
+        if not delete_filtered(Favorite, user=request.user, recipe=recipe):
             return Response(status=status.HTTP_400_BAD_REQUEST)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
         detail=True,
@@ -91,47 +221,82 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
         if request.method == "POST":
             serializer = ShoppingCartSerializer(
-                data={"user": request.user.id, "recipe": recipe.id},
-                context={"request": request},
+                data={}, context={"request": request}
             )
             serializer.is_valid(raise_exception=True)
-            serializer.save()
+            serializer.save(user=request.user, recipe=recipe)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-        try:
-            cart_item = ShoppingCart.objects.get(
-                user=request.user, recipe=recipe
-            )
-            cart_item.delete()
-            return Response(status=status.HTTP_204_NO_CONTENT)
-        except ShoppingCart.DoesNotExist:
+        if not delete_filtered(ShoppingCart, user=request.user, recipe=recipe):
             return Response(status=status.HTTP_400_BAD_REQUEST)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def change_recipes(self, request, model, counter):
+        serializer = RecipeBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        change = add_recipes if request.method == "POST" else remove_recipes
+        results = change(
+            model,
+            counter,
+            request.user,
+            serializer.validated_data["recipes"],
+        )
+        return Response(
+            {
+                "results": [
+                    {"id": pk, "status": result}
+                    for pk, result in results.items()
+                ]
+            }
+        )
+
+    @action(
+        detail=False,
+        methods=["post", "delete"],
+        permission_classes=[permissions.IsAuthenticated],
+        url_path="favorite/batch",
+    )
+    def favorite_batch(self, request):
+        """Пакетно добавляет рецепты в избранное или убирает их."""
+        return self.change_recipes(request, Favorite, "favorites_count")
+
+    @action(
+        detail=False,
+        methods=["post", "delete"],
+        permission_classes=[permissions.IsAuthenticated],
+        url_path="shopping_cart/batch",
+    )
+    def shopping_cart_batch(self, request):
+        """Пакетно добавляет рецепты в список покупок или убирает их."""
+        return self.change_recipes(
+            request, ShoppingCart, "shopping_cart_count"
+        )
 
     @action(
         detail=False,
         methods=["get"],
         permission_classes=[permissions.IsAuthenticated],
+        renderer_classes=SHOPPING_LIST_RENDERER_CLASSES,
     )
     def download_shopping_cart(self, request):
-        ingredients = (
-            RecipeIngredient.objects.filter(
-                recipe__shopping_cart__user=request.user
-            )
-            .values("ingredient__name", "ingredient__measurement_unit")
-            .annotate(total_amount=Sum("amount"))
-            .order_by("ingredient__name")
-        )
+        """
+        Отдаёт список покупок файлом.
 
-        shopping_list = "Список покупок:\n\n"
-        for item in ingredients:
-            shopping_list += (
-                f"{item['ingredient__name']} "
-                f"({item['ingredient__measurement_unit']}) — "
-                f"{item['total_amount']}\n"
+        Под ASGI GET-запросы обслуживает AsyncShoppingListView: этот
+        синхронный поток Django там собрал бы в память целиком.
+        """
+        # Неизвестный format отклоняется ещё при согласовании рендерера.
+        file_format = request.query_params.get(
+            "format", PlainTextRenderer.format
+        )
+        if file_format == "pdf":
+            return FileResponse(
+                get_pdf(request.user),
+                as_attachment=True,
+                filename=f"shopping_list.{file_format}",
+                content_type=SHOPPING_LIST_CONTENT_TYPES[file_format],
             )
-
-        response = HttpResponse(shopping_list, content_type="text/plain")
-        response["Content-Disposition"] = (
-            'attachment; filename="shopping_list.txt"'
+        rows = get_shopping_list_rows(request.user)
+        return make_attachment(
+            SHOPPING_LIST_STREAMS[file_format](rows), file_format
         )
-        return response
@@ -1,22 +1,23 @@
 from rest_framework import serializers
 
-from core.common_serializers import RecipeMinifiedSerializer
+from core.common_serializers import (
+    InsertIgnoreSerializerMixin,
+    RecipeMinifiedSerializer,
+)
 from .models import ShoppingCart
 
 
-class ShoppingCartSerializer(serializers.ModelSerializer):
+class ShoppingCartSerializer(
+    InsertIgnoreSerializerMixin, serializers.ModelSerializer
+):
     """Сериализатор для списка покупок."""
 
+    unique_message = "Рецепт уже в списке покупок"
+
     class Meta:
         model = ShoppingCart
         fields = ("user", "recipe")
-        validators = [
-            serializers.UniqueTogetherValidator(
-                queryset=ShoppingCart.objects.all(),
-                fields=("user", "recipe"),
-                message="Рецепт уже в списке покупок",
-            )
-        ]
+        read_only_fields = ("user", "recipe")
 
     def to_representation(self, instance):
         return RecipeMinifiedSerializer(
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.counters import change_counter
+from recipes.models import Recipe
+from .models import ShoppingCart
+
+
+@receiver(post_save, sender=ShoppingCart)
+def increment_shopping_cart_count(sender, instance, created, **kwargs):
+    """Увеличивает счётчик добавлений рецепта в списки покупок."""
+    if created:
+        change_counter(Recipe, instance.recipe_id, "shopping_cart_count", 1)
+
+
+@receiver(post_delete, sender=ShoppingCart)
+def decrement_shopping_cart_count(sender, instance, **kwargs):
+    """Уменьшает счётчик добавлений рецепта в списки покупок."""
+    change_counter(Recipe, instance.recipe_id, "shopping_cart_count", -1)
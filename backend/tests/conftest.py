@@ -0,0 +1,94 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from recipes.recipe_cache import recipe_cache
+from users.authentication import token_cache
+from users.models import User
+
+RECIPE_IMAGE = "recipes/test.png"
+
+
+def make_client(user=None):
+    client = APIClient()
+    if user is not None:
+        client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Первичные ключи после отката повторяются, поэтому кэши чистятся."""
+    yield
+    recipe_cache.clear()
+    token_cache.clear()
+    cache.clear()
+
+
+@pytest.fixture
+def make_user(db):
+    counter = iter(range(1, 10**6))
+
+    def make_user():
+        number = next(counter)
+        return User.objects.create_user(
+            email=f"user{number}@example.com",
+            username=f"user{number}",
+            first_name="Имя",
+            last_name="Фамилия",
+            password="Pa$$w0rd!",
+        )
+
+    return make_user
+
+
+@pytest.fixture
+def user(make_user):
+    return make_user()
+
+
+@pytest.fixture
+def author(make_user):
+    return make_user()
+
+
+@pytest.fixture
+def user_client(user):
+    return make_client(user)
+
+
+@pytest.fixture
+def ingredients(db):
+    return Ingredient.objects.bulk_create(
+        Ingredient(name=f"ингредиент {number}", measurement_unit="г")
+        for number in range(10)
+    )
+
+
+@pytest.fixture
+def make_recipe(ingredients):
+    """
+    Создаёт рецепт с ингредиентами.
+
+    Миниатюры помечены готовыми, поэтому сохранение рецепта не ставит
+    задачу в очередь построения.
+    """
+
+    def make_recipe(author, ingredient_count=3, **fields):
+        recipe = Recipe.objects.create(
+            author=author,
+            name=fields.pop("name", "Рецепт"),
+            image=RECIPE_IMAGE,
+            image_renditions={"source": RECIPE_IMAGE},
+            text="Описание",
+            cooking_time=fields.pop("cooking_time", 10),
+            **fields,
+        )
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(recipe=recipe, ingredient=ingredient, amount=1)
+            for ingredient in ingredients[:ingredient_count]
+        )
+        return recipe
+
+    return make_recipe
@@ -0,0 +1,75 @@
+import pytest
+from django.db import connection
+
+from recipes.filters import RecipeFilter
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != "postgresql",
+    reason="Планы запросов проверяются только на PostgreSQL",
+)
+
+RECIPES_COUNT = 2000
+INGREDIENTS_COUNT = 200
+RECIPE_INGREDIENTS_COUNT = 3
+
+
+def index_name(model, fields):
+    return next(
+        index.name
+        for index in model._meta.indexes
+        if list(index.fields) == fields
+    )
+
+
+@pytest.fixture
+def catalog(author):
+    """Рецепты и ингредиенты, по которым у PostgreSQL есть статистика."""
+    ingredients = Ingredient.objects.bulk_create(
+        Ingredient(name=f"ингредиент {number}", measurement_unit="г")
+        for number in range(INGREDIENTS_COUNT)
+    )
+    recipes = Recipe.objects.bulk_create(
+        Recipe(
+            author=author,
+            name=f"Рецепт {number}",
+            image="recipes/test.png",
+            text="Описание",
+            cooking_time=number % 200 + 1,
+        )
+        for number in range(RECIPES_COUNT)
+    )
+    RecipeIngredient.objects.bulk_create(
+        RecipeIngredient(
+            recipe=recipe,
+            ingredient=ingredients[(number + shift) % INGREDIENTS_COUNT],
+            amount=1,
+        )
+        for number, recipe in enumerate(recipes)
+        for shift in range(RECIPE_INGREDIENTS_COUNT)
+    )
+    with connection.cursor() as cursor:
+        for model in (Recipe, RecipeIngredient):
+            cursor.execute(f"ANALYZE {model._meta.db_table}")
+    return ingredients
+
+
+def explain(params):
+    return RecipeFilter(params, queryset=Recipe.objects.all()).qs.explain()
+
+
+@pytest.mark.parametrize(
+    "name", ["ingredients_all", "ingredients_any", "ingredients_exclude"]
+)
+def test_ingredient_filters_use_ingredient_recipe_index(catalog, name):
+    ingredient_ids = ",".join(str(item.pk) for item in catalog[:2])
+
+    plan = explain({name: ingredient_ids})
+
+    assert index_name(RecipeIngredient, ["ingredient", "recipe"]) in plan
+
+
+def test_cooking_time_filter_uses_cooking_time_index(catalog):
+    plan = explain({"cooking_time_min": 10, "cooking_time_max": 11})
+
+    assert index_name(Recipe, ["cooking_time", "-pub_date"]) in plan
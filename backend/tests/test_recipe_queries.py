@@ -0,0 +1,81 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from users.models import Subscription
+from .conftest import make_client
+
+RECIPES_COUNT = 5
+
+
+def warm_up(client, url):
+    """
+    Запрашивает пустую страницу перед замером.
+
+    Запрос прогревает кэши процесса, но не кэш рецептов: иначе при
+    замере сериализатор не обратился бы к ингредиентам.
+    """
+    assert client.get(url).status_code == 200
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries)
+
+
+@pytest.fixture
+def authors(make_user, make_recipe):
+    """Авторы с одним рецептом и с RECIPES_COUNT рецептами."""
+    single, many = make_user(), make_user()
+    make_recipe(single)
+    for _ in range(RECIPES_COUNT):
+        make_recipe(many)
+    return single, many
+
+
+@pytest.mark.parametrize("authenticated", [False, True])
+def test_recipe_list_query_count_does_not_depend_on_page_size(
+    authors, user, authenticated
+):
+    client = make_client(user if authenticated else None)
+    single, many = authors
+    warm_up(client, f"/api/recipes/?author={user.pk}")
+
+    assert count_queries(
+        client, f"/api/recipes/?author={single.pk}"
+    ) == count_queries(client, f"/api/recipes/?author={many.pk}")
+
+
+def test_feed_query_count_does_not_depend_on_page_size(authors, make_user):
+    single, many = authors
+    single_follower, many_follower = make_user(), make_user()
+    Subscription.objects.create(user=single_follower, author=single)
+    Subscription.objects.create(user=many_follower, author=many)
+    warm_up(make_client(make_user()), "/api/recipes/feed/")
+
+    assert count_queries(
+        make_client(single_follower), "/api/recipes/feed/"
+    ) == count_queries(make_client(many_follower), "/api/recipes/feed/")
+
+
+def test_subscriptions_query_count_does_not_depend_on_page_size(
+    make_user, make_recipe
+):
+    single_follower, many_follower = make_user(), make_user()
+    for follower, authors_count in (
+        (single_follower, 1),
+        (many_follower, RECIPES_COUNT),
+    ):
+        for _ in range(authors_count):
+            author = make_user()
+            make_recipe(author)
+            make_recipe(author)
+            Subscription.objects.create(user=follower, author=author)
+    url = "/api/users/subscriptions/?recipes_limit=1"
+    warm_up(make_client(make_user()), url)
+
+    assert count_queries(make_client(single_follower), url) == count_queries(
+        make_client(many_follower), url
+    )
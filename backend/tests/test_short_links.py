@@ -0,0 +1,46 @@
+import pytest
+from rest_framework import status
+
+from recipes.short_links import encode_recipe_id, get_recipe_short_link
+from .conftest import make_client
+
+
+@pytest.fixture
+def recipe(make_recipe, author):
+    return make_recipe(author)
+
+
+def test_computed_short_link_redirects_to_recipe(recipe):
+    response = make_client().get(f"/s/{get_recipe_short_link(recipe)}/")
+
+    assert response.status_code == status.HTTP_302_FOUND
+    assert response["Location"] == f"/recipes/{recipe.pk}/"
+
+
+def test_legacy_short_link_redirects_to_recipe(make_recipe, author):
+    recipe = make_recipe(author, short_link="legacy01")
+
+    response = make_client().get("/s/legacy01/")
+
+    assert response.status_code == status.HTTP_302_FOUND
+    assert response["Location"] == f"/recipes/{recipe.pk}/"
+
+
+@pytest.mark.parametrize("code", ["zzzzzz", "unknown1"])
+def test_unknown_short_link_returns_404(recipe, code):
+    response = make_client().get(f"/s/{code}/")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_deleted_recipe_short_link_returns_404(
+    recipe, django_capture_on_commit_callbacks
+):
+    code = encode_recipe_id(recipe.pk)
+    make_client().get(f"/s/{code}/")
+    with django_capture_on_commit_callbacks(execute=True):
+        recipe.delete()
+
+    response = make_client().get(f"/s/{code}/")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
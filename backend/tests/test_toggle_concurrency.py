@@ -0,0 +1,79 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import connection
+from rest_framework import status
+
+from favorites.models import Favorite
+from recipes.models import Recipe
+from shopping_cart.models import ShoppingCart
+from users.models import Subscription, User
+from .conftest import make_client
+
+THREADS_COUNT = 8
+
+
+def send_concurrently(user, method, url):
+    """Отправляет один и тот же запрос из нескольких потоков сразу."""
+    barrier = threading.Barrier(THREADS_COUNT)
+
+    def send(_):
+        client = make_client(user)
+        try:
+            barrier.wait()
+            return getattr(client, method)(url).status_code
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(THREADS_COUNT) as executor:
+        return sorted(executor.map(send, range(THREADS_COUNT)))
+
+
+def get_counter(model, pk, field):
+    return model.objects.values_list(field, flat=True).get(pk=pk)
+
+
+@pytest.fixture
+def toggles(user, author, make_recipe):
+    """Для каждой связи: url, строки пользователя и счётчик."""
+    recipe = make_recipe(author)
+    return {
+        "favorite": (
+            f"/api/recipes/{recipe.pk}/favorite/",
+            Favorite.objects.filter(user=user, recipe=recipe),
+            (Recipe, recipe.pk, "favorites_count"),
+        ),
+        "shopping_cart": (
+            f"/api/recipes/{recipe.pk}/shopping_cart/",
+            ShoppingCart.objects.filter(user=user, recipe=recipe),
+            (Recipe, recipe.pk, "shopping_cart_count"),
+        ),
+        "subscribe": (
+            f"/api/users/{author.pk}/subscribe/",
+            Subscription.objects.filter(user=user, author=author),
+            (User, author.pk, "followers_count"),
+        ),
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("name", ["favorite", "shopping_cart", "subscribe"])
+def test_concurrent_toggles_write_once(user, toggles, name):
+    url, rows, counter = toggles[name]
+
+    statuses = send_concurrently(user, "post", url)
+
+    assert statuses == [status.HTTP_201_CREATED] + [
+        status.HTTP_400_BAD_REQUEST
+    ] * (THREADS_COUNT - 1)
+    assert rows.count() == 1
+    assert get_counter(*counter) == 1
+
+    statuses = send_concurrently(user, "delete", url)
+
+    assert statuses == [status.HTTP_204_NO_CONTENT] + [
+        status.HTTP_400_BAD_REQUEST
+    ] * (THREADS_COUNT - 1)
+    assert rows.count() == 0
+    assert get_counter(*counter) == 0
@@ -0,0 +1,167 @@
+from collections import Counter
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from favorites.models import Favorite
+from recipes.models import Recipe
+from shopping_cart.models import ShoppingCart
+from users.models import Subscription
+from .conftest import make_client
+
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE")
+RELATION_MODELS = {"favorite": Favorite, "shopping_cart": ShoppingCart}
+
+
+def count_writes(request, model=None):
+    """
+    Выполняет запрос и считает INSERT, UPDATE и DELETE.
+
+    Если передана model, считаются и SELECT строк её таблицы: на SQLite
+    SELECT ... FOR UPDATE выполняется как обычный SELECT.
+    """
+    table = model and connection.ops.quote_name(model._meta.db_table)
+    statements = Counter()
+    with CaptureQueriesContext(connection) as context:
+        response = request()
+    for query in context.captured_queries:
+        kind, _, sql = query["sql"].partition(" ")
+        kind = kind.upper()
+        if kind in WRITE_STATEMENTS or (
+            kind == "SELECT" and table and sql.startswith(f"{table}.")
+        ):
+            statements[kind] += 1
+    return response, {
+        kind: statements[kind] for kind in ("SELECT", *WRITE_STATEMENTS)
+    }
+
+
+def writes(select=0, insert=0, update=0, delete=0):
+    return {
+        "SELECT": select,
+        "INSERT": insert,
+        "UPDATE": update,
+        "DELETE": delete,
+    }
+
+
+@pytest.fixture
+def recipe(make_recipe, author):
+    return make_recipe(author)
+
+
+def ingredients_payload(recipe):
+    return [
+        {"id": item.ingredient_id, "amount": item.amount}
+        for item in recipe.recipe_ingredients.order_by("pk")
+    ]
+
+
+@pytest.mark.parametrize(
+    "edit, expected",
+    [
+        (lambda items, spare: None, writes(update=1)),
+        (lambda items, spare: items, writes(update=1)),
+        (
+            lambda items, spare: [{**items[0], "amount": 5}, *items[1:]],
+            writes(update=2),
+        ),
+        (
+            lambda items, spare: [*items, {"id": spare.pk, "amount": 1}],
+            writes(insert=1, update=1),
+        ),
+        (lambda items, spare: items[1:], writes(update=2, delete=1)),
+    ],
+    ids=["name", "same", "amount", "add", "remove"],
+)
+def test_recipe_update_writes_only_changes(
+    recipe, author, ingredients, edit, expected
+):
+    payload = {"name": "Новое название"}
+    items = edit(ingredients_payload(recipe), ingredients[-1])
+    if items is not None:
+        payload["ingredients"] = items
+
+    response, counts = count_writes(
+        lambda: make_client(author).patch(
+            f"/api/recipes/{recipe.pk}/", payload, format="json"
+        )
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert counts == expected
+    if items is not None:
+        assert ingredients_payload(recipe) == items
+
+
+@pytest.mark.parametrize("relation", ["favorite", "shopping_cart"])
+def test_recipe_relation_writes(user_client, recipe, relation):
+    url = f"/api/recipes/{recipe.pk}/{relation}/"
+    model = RELATION_MODELS[relation]
+
+    response, counts = count_writes(lambda: user_client.post(url), model)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert counts == writes(insert=1, update=1)
+
+    response, counts = count_writes(lambda: user_client.post(url), model)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert counts == writes(insert=1)
+
+    # SELECT ... FOR UPDATE, DELETE строки и UPDATE счётчика.
+    response, counts = count_writes(lambda: user_client.delete(url), model)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert counts == writes(select=1, update=1, delete=1)
+
+    response, counts = count_writes(lambda: user_client.delete(url), model)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert counts == writes(select=1)
+
+
+@pytest.mark.parametrize("relation", ["favorite", "shopping_cart"])
+def test_recipe_batch_writes(user_client, make_recipe, author, relation):
+    recipe_ids = [make_recipe(author).pk for _ in range(3)]
+    url = f"/api/recipes/{relation}/batch/"
+
+    response, counts = count_writes(
+        lambda: user_client.post(url, {"recipes": recipe_ids}, format="json")
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert counts == writes(insert=1, update=1)
+
+    response, counts = count_writes(
+        lambda: user_client.delete(
+            url, {"recipes": recipe_ids}, format="json"
+        )
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert counts == writes(update=1, delete=1)
+
+
+def test_subscription_writes(user_client, recipe, author):
+    Recipe.objects.filter(pk=recipe.pk).update(fanned_out=True)
+    url = f"/api/users/{author.pk}/subscribe/"
+
+    def send(method):
+        return count_writes(
+            lambda: getattr(user_client, method)(url), Subscription
+        )
+
+    response, counts = send("post")
+    assert response.status_code == status.HTTP_201_CREATED
+    # Подписка, запись ленты и счётчик подписчиков.
+    assert counts == writes(insert=2, update=1)
+
+    response, counts = send("post")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert counts == writes(insert=1)
+
+    response, counts = send("delete")
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    # SELECT ... FOR UPDATE подписки; подписка, записи ленты и счётчик.
+    assert counts == writes(select=1, update=1, delete=2)
+
+    response, counts = send("delete")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert counts == writes(select=1)
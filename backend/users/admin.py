@@ -6,7 +6,14 @@ from .models import Subscription, User
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
-    list_display = ("username", "email", "first_name", "last_name")
+    list_display = (
+        "username",
+        "email",
+        "first_name",
+        "last_name",
+        "recipes_count",
+        "followers_count",
+    )
     search_fields = ("username", "email", "first_name", "last_name")
     list_filter = ("is_staff", "is_active", "is_superuser")
     fieldsets = (
@@ -28,7 +35,9 @@ class CustomUserAdmin(UserAdmin):
             },
         ),
         ("Important dates", {"fields": ("last_login", "date_joined")}),
+        ("Statistics", {"fields": ("recipes_count", "followers_count")}),
     )
+    readonly_fields = ("recipes_count", "followers_count")
 
 
 @admin.register(Subscription)
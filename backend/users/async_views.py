@@ -0,0 +1,33 @@
+from django.contrib.auth import get_user_model
+from rest_framework import permissions
+
+from core.async_views import AsyncReadView
+from core.pagination import FeedPagination
+from .serializers import RecipesLimitSerializer, UserWithRecipesSerializer
+
+User = get_user_model()
+
+
+class AsyncSubscriptionsView(AsyncReadView):
+    """Асинхронный список подписок текущего пользователя."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    async def get(self, request):
+        limit_serializer = RecipesLimitSerializer(data=request.query_params)
+        limit_serializer.is_valid(raise_exception=True)
+        recipes_limit = limit_serializer.validated_data.get("recipes_limit")
+
+        authors = (
+            User.objects.filter(following__user=request.user)
+            .with_recipes(recipes_limit)
+            .with_is_subscribed(request.user)
+        )
+        paginator = FeedPagination()
+        page = await paginator.apaginate_queryset(authors, request, self)
+        serializer = UserWithRecipesSerializer(
+            page,
+            many=True,
+            context={"request": request, "recipes_limit": recipes_limit},
+        )
+        return paginator.get_paginated_response(serializer.data).data
@@ -0,0 +1,46 @@
+import copy
+
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication
+
+from core.caches import SharedVersion, load_cache_backend
+
+token_cache = load_cache_backend(settings.TOKEN_CACHE)
+token_generation = SharedVersion(
+    "auth-token:generation",
+    alias=settings.TOKEN_CACHE["OPTIONS"].get("alias", "default"),
+)
+
+
+def make_token_cache_key(key):
+    return f"auth-token:{key}"
+
+
+def forget_tokens():
+    """Сбрасывает кэш токенов во всех процессах."""
+    token_generation.bump()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Аутентификация по токену с кэшем токенов и пользователей.
+
+    Запрос Token JOIN User выполняется только при промахе кэша. Каждая
+    запись помечена поколением из общего кэша Django; выход, смена
+    пароля и деактивация меняют поколение, и записи других поколений
+    считаются промахом. Каждый запрос получает свою копию пользователя,
+    поэтому его изменения не попадают в кэш.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = make_token_cache_key(key)
+        generation = token_generation.get()
+        entry = token_cache.get(cache_key)
+        if entry is not None and entry[0] == generation:
+            token = entry[1]
+        else:
+            _, token = super().authenticate_credentials(key)
+            token_cache.set(cache_key, (generation, token))
+        token = copy.copy(token)
+        token.user = copy.copy(token.user)
+        return token.user, token
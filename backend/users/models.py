@@ -1,4 +1,5 @@
-from django.contrib.auth.models import AbstractUser
+from django.apps import apps
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
@@ -8,6 +9,52 @@ from core.constants import (
     MAX_LAST_NAME_LENGTH,
 )
 
+# Поля, при изменении которых сбрасывается кэш токенов.
+AUTH_FIELDS = ("password", "is_active")
+
+
+class UserQuerySet(models.QuerySet):
+    """Набор запросов пользователей."""
+
+    def with_is_subscribed(self, user):
+        """Аннотирует пользователей флагом подписки на них."""
+        if not user.is_authenticated:
+            return self.annotate(is_subscribed=models.Value(False))
+        return self.annotate(
+            is_subscribed=models.Exists(
+                Subscription.objects.filter(
+                    user=user, author=models.OuterRef("pk")
+                )
+            )
+        )
+
+    def with_recipes(self, recipes_limit=None):
+        """
+        Подгружает рецепты авторов.
+
+        При заданном лимите последние рецепты всех авторов выбираются
+        одним запросом с ROW_NUMBER() OVER (PARTITION BY author).
+        """
+        recipes = apps.get_model("recipes", "Recipe").objects.only(
+            "id",
+            "name",
+            "image",
+            "image_renditions",
+            "cooking_time",
+            "author",
+        )
+        if recipes_limit is not None:
+            recipes = recipes[:recipes_limit]
+        return self.prefetch_related(
+            models.Prefetch(
+                "recipes", queryset=recipes, to_attr="prefetched_recipes"
+            )
+        )
+
+
+class CustomUserManager(UserManager.from_queryset(UserQuerySet)):
+    """Менеджер пользователей с поддержкой аннотаций подписки."""
+
 
 class User(AbstractUser):
     """Кастомная модель пользователя."""
@@ -31,15 +78,68 @@ class User(AbstractUser):
         null=True,
         blank=True,
     )
+    avatar_renditions = models.JSONField(
+        _("avatar renditions"),
+        default=dict,
+        blank=True,
+        editable=False,
+    )
+    recipes_count = models.PositiveIntegerField(
+        _("recipes count"),
+        default=0,
+        editable=False,
+    )
+    followers_count = models.PositiveIntegerField(
+        _("followers count"),
+        default=0,
+        editable=False,
+    )
+    # Растёт при каждом сохранении профиля и построении миниатюр
+    # аватара; входит в ETag профиля и рецептов пользователя.
+    version = models.PositiveIntegerField(
+        _("version"),
+        default=0,
+        editable=False,
+    )
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username", "first_name", "last_name"]
 
+    objects = CustomUserManager()
+
     class Meta:
         verbose_name = _("user")
         verbose_name_plural = _("users")
         ordering = ("username",)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user._saved_auth_state = user.get_auth_state()
+        return user
+
+    def get_auth_state(self):
+        """Поля, от которых зависит вход; отложенные поля не загружаются."""
+        return tuple(self.__dict__.get(name) for name in AUTH_FIELDS)
+
+    def auth_state_changed(self, update_fields=None):
+        """Изменились ли пароль или активность с загрузки из базы."""
+        if update_fields is not None and not set(AUTH_FIELDS).intersection(
+            update_fields
+        ):
+            return False
+        saved_state = getattr(self, "_saved_auth_state", None)
+        return saved_state != self.get_auth_state()
+
+    def save(self, *args, **kwargs):
+        is_update = not self._state.adding
+        if is_update:
+            self.version = models.F("version") + 1
+        super().save(*args, **kwargs)
+        self._saved_auth_state = self.get_auth_state()
+        if is_update:
+            self.refresh_from_db(fields=["version"])
+
     def __str__(self):
         return self.username
 
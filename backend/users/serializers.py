@@ -2,7 +2,7 @@ from django.contrib.auth import get_user_model
 from djoser.serializers import UserCreateSerializer, UserSerializer
 from rest_framework import serializers
 
-from core.fields import Base64ImageField
+from core.fields import Base64ImageField, ImageRenditionsField
 from core.common_serializers import RecipeMinifiedSerializer
 
 User = get_user_model()
@@ -29,6 +29,7 @@ class CustomUserSerializer(UserSerializer):
 
     is_subscribed = serializers.SerializerMethodField(read_only=True)
     avatar = serializers.ImageField(read_only=True)
+    avatar_renditions = ImageRenditionsField("avatar")
 
     class Meta:
         model = User
@@ -40,9 +41,12 @@ class CustomUserSerializer(UserSerializer):
             "last_name",
             "is_subscribed",
             "avatar",
+            "avatar_renditions",
         )
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, "is_subscribed"):
+            return obj.is_subscribed
         user = self.context.get("request").user
         if user.is_anonymous or user == obj:
             return False
@@ -62,21 +66,30 @@ class UserWithRecipesSerializer(CustomUserSerializer):
         )
 
     def get_recipes(self, obj):
-        request = self.context.get("request")
-        limit = request.query_params.get("recipes_limit")
-        recipes = obj.recipes.all()
-        if limit:
-            try:
-                limit = int(limit)
+        recipes = getattr(obj, "prefetched_recipes", None)
+        if recipes is None:
+            recipes = obj.recipes.all()
+            limit = self.context.get("recipes_limit")
+            if limit is not None:
                 recipes = recipes[:limit]
-            except ValueError:
-                raise serializers.ValidationError(
-                    "Лимит рецептов должен быть целым числом."
-                )
-        return RecipeMinifiedSerializer(recipes, many=True).data
+        return RecipeMinifiedSerializer(
+            recipes, many=True, context=self.context
+        ).data
 
     def get_recipes_count(self, obj):
-        return obj.recipes.count()
+        return obj.recipes_count
+
+
+class RecipesLimitSerializer(serializers.Serializer):
+    """Сериализатор для проверки параметра recipes_limit."""
+
+    recipes_limit = serializers.IntegerField(
+        min_value=0,
+        required=False,
+        error_messages={
+            "invalid": "Лимит рецептов должен быть целым числом."
+        },
+    )
 
 
 class SetAvatarSerializer(serializers.ModelSerializer):
@@ -0,0 +1,47 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from core.counters import change_counter
+from core.images import schedule_renditions
+from .authentication import forget_tokens
+from .models import Subscription, User
+
+
+@receiver(post_save, sender=Subscription)
+def increment_followers_count(sender, instance, created, **kwargs):
+    """Увеличивает счётчик подписчиков автора."""
+    if created:
+        change_counter(User, instance.author_id, "followers_count", 1)
+
+
+@receiver(post_delete, sender=Subscription)
+def decrement_followers_count(sender, instance, **kwargs):
+    """Уменьшает счётчик подписчиков автора."""
+    change_counter(User, instance.author_id, "followers_count", -1)
+
+
+@receiver(post_save, sender=User)
+def build_avatar_renditions(sender, instance, update_fields, **kwargs):
+    """Ставит в очередь построение миниатюр аватара."""
+    if update_fields is None or "avatar" in update_fields:
+        transaction.on_commit(
+            lambda: schedule_renditions(
+                instance, "avatar", {"version": F("version") + 1}
+            )
+        )
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Сбрасывает кэш токенов: выход или удаление пользователя."""
+    transaction.on_commit(forget_tokens)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, created, update_fields, **kwargs):
+    """Сбрасывает кэш токенов при смене пароля или активности."""
+    if not created and instance.auth_state_changed(update_fields):
+        transaction.on_commit(forget_tokens)
@@ -1,31 +1,35 @@
 from rest_framework import serializers
 
-from .models import Subscription
+from core.common_serializers import (
+    InsertIgnoreSerializerMixin,
+    non_field_error,
+)
+from .models import Subscription, User
 from .serializers import UserWithRecipesSerializer
 
 
-class SubscriptionSerializer(serializers.ModelSerializer):
+class SubscriptionSerializer(
+    InsertIgnoreSerializerMixin, serializers.ModelSerializer
+):
     """Сериализатор для подписок."""
 
+    unique_message = "Вы уже подписаны на этого автора"
+
     class Meta:
         model = Subscription
         fields = ("user", "author")
-        validators = [
-            serializers.UniqueTogetherValidator(
-                queryset=Subscription.objects.all(),
-                fields=("user", "author"),
-                message="Вы уже подписаны на этого автора",
-            )
-        ]
+        read_only_fields = ("user", "author")
 
-    def validate(self, data):
-        if data["user"] == data["author"]:
-            raise serializers.ValidationError(
-                "Нельзя подписаться на самого себя"
-            )
-        return data
+    def create(self, validated_data):
+        if validated_data["user"] == validated_data["author"]:
+            raise non_field_error("Нельзя подписаться на самого себя")
+        return super().create(validated_data)
 
     def to_representation(self, instance):
-        return UserWithRecipesSerializer(
-            instance.author, context={"request": self.context.get("request")}
-        ).data
+        request = self.context.get("request")
+        author = (
+            User.objects.with_recipes(self.context.get("recipes_limit"))
+            .with_is_subscribed(request.user)
+            .get(pk=instance.author_id)
+        )
+        return UserWithRecipesSerializer(author, context=self.context).data
@@ -5,10 +5,18 @@ from rest_framework import permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from core.pagination import CustomPagination
+from core.conditional import (
+    etag_matches,
+    make_etag,
+    not_modified,
+    set_etag,
+)
+from core.pagination import CustomPagination, FeedPagination
+from core.toggles import delete_filtered
 from .models import Subscription
 from .serializers import (
     CustomUserSerializer,
+    RecipesLimitSerializer,
     SetAvatarSerializer,
     SetPasswordSerializer,
     UserWithRecipesSerializer,
@@ -26,6 +34,26 @@ class CustomUserViewSet(UserViewSet):
     pagination_class = CustomPagination
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ["list", "retrieve"]:
+            return queryset.with_is_subscribed(self.request.user)
+        return queryset
+
+    def retrieve(self, request, *args, **kwargs):
+        """Профиль с ETag по версии пользователя и флагу подписки."""
+        user = self.get_object()
+        etag = make_etag(
+            request.build_absolute_uri("/"),
+            user.pk,
+            user.version,
+            user.is_subscribed,
+        )
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        serializer = self.get_serializer(user)
+        return set_etag(Response(serializer.data), etag)
+
     @action(
         detail=False,
         methods=["get"],
@@ -69,16 +97,29 @@ class CustomUserViewSet(UserViewSet):
         serializer.save()
         return Response(serializer.data)
 
+    def get_recipes_limit(self, request):
+        serializer = RecipesLimitSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data.get("recipes_limit")
+
     @action(
         detail=False,
         methods=["get"],
         permission_classes=[permissions.IsAuthenticated],
+        pagination_class=FeedPagination,
     )
     def subscriptions(self, request):
-        authors = User.objects.filter(following__user=request.user)
+        recipes_limit = self.get_recipes_limit(request)
+        authors = (
+            User.objects.filter(following__user=request.user)
+            .with_recipes(recipes_limit)
+            .with_is_subscribed(request.user)
+        )
         paginated_queryset = self.paginate_queryset(authors)
         serializer = UserWithRecipesSerializer(
-            paginated_queryset, many=True, context={"request": request}
+            paginated_queryset,
+            many=True,
+            context={"request": request, "recipes_limit": recipes_limit},
         )
         return self.get_paginated_response(serializer.data)
 
@@ -88,22 +129,18 @@ class CustomUserViewSet(UserViewSet):
         permission_classes=[permissions.IsAuthenticated],
     )
     def subscribe(self, request, id=None):
+        recipes_limit = self.get_recipes_limit(request)
         author = get_object_or_404(User, id=id)
 
         if request.method == "POST":
             serializer = SubscriptionSerializer(
-                data={"user": request.user.id, "author": author.id},
-                context={"request": request},
+                data={},
+                context={"request": request, "recipes_limit": recipes_limit},
             )
             serializer.is_valid(raise_exception=True)
-            serializer.save()
+            serializer.save(user=request.user, author=author)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-        try:
-            subscription = Subscription.objects.get(
-                user=request.user, author=author
-            )
-            subscription.delete()
-            return Response(status=status.HTTP_204_NO_CONTENT)
-        except Subscription.DoesNotExist:
+        if not delete_filtered(Subscription, user=request.user, author=author):
             return Response(status=status.HTTP_400_BAD_REQUEST)
+        return Response(status=status.HTTP_204_NO_CONTENT)